@@ -2,12 +2,12 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import logging
 from routes.players import players_bp
-from routes.submissions import submissions_bp
-import pandas as pd
-import numpy as np
-from datetime import datetime
-import json
-import os
+from routes.submissions import (INVALID_BODY_ERROR, INVALID_PLAYERS_ERROR, parse_player_ids, roster_rule_error,
+                                submissions_bp)
+from game_dates import game_date
+from routes.stats import stats_bp
+from player_table import player_table
+from roster_space import team_stats_dict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,12 +31,10 @@ CORS(app, resources={
     }
 })
 
-# Load player data
-players_df = pd.read_csv('nba_players_final_updated.csv')
-
 # Register blueprints
 app.register_blueprint(players_bp)
 app.register_blueprint(submissions_bp)
+app.register_blueprint(stats_bp)
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -44,31 +42,26 @@ def health_check():
 
 @app.route('/api/simulate', methods=['POST'])
 def simulate():
-    data = request.json
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': INVALID_BODY_ERROR}), 400
     players = data.get('players', [])
     nickname = data.get('nickname', '')
     
-    if not players or len(players) != 5:
+    if not isinstance(players, list) or len(players) != 5:
         return jsonify({'error': 'Invalid team size'}), 400
     
-    # Get player data
-    player_data = []
-    for player in players:
-        player_row = players_df[players_df['Player ID'] == player['id']].iloc[0]
-        player_data.append(player_row)
-    
-    # Calculate team stats
-    team_stats = {
-        'points': sum(p['Points Per Game (Avg)'] for p in player_data),
-        'rebounds': sum(p['Rebounds Per Game (Avg)'] for p in player_data),
-        'assists': sum(p['Assists Per Game (Avg)'] for p in player_data),
-        'steals': sum(p['Steals Per Game (Avg)'] for p in player_data),
-        'blocks': sum(p['Blocks Per Game (Avg)'] for p in player_data),
-        'turnovers': sum(p['TOV'] for p in player_data),
-        'fg_pct': sum(p['Field Goal % (Avg)'] for p in player_data) / 5,
-        'ft_pct': sum(p['Free Throw % (Avg)'] for p in player_data) / 5,
-        'three_pct': sum(p['Three Point % (Avg)'] for p in player_data) / 5
-    }
+    # Calculate team stats from the ID-indexed player matrix
+    player_ids = parse_player_ids(players)
+    if player_ids is None:
+        return jsonify({'error': INVALID_PLAYERS_ERROR}), 400
+    unknown_ids = [player_id for player_id in player_ids if player_id not in player_table]
+    if unknown_ids:
+        return jsonify({'error': f'Unknown player IDs: {unknown_ids}'}), 400
+    rule_error = roster_rule_error(game_date(), player_ids)
+    if rule_error:
+        return jsonify({'error': rule_error}), 400
+    team_stats = team_stats_dict(player_table.team_features(player_ids)[0])
     
     return jsonify({
         'team_stats': team_stats
@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+
+
+class PendingItem:
+    """An item waiting for a batcher thread, and the value or error it ended with"""
+
+    def __init__(self, item):
+        self.item = item
+        self.value = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class QueueBatcher:
+    """Background thread that hands queued items to `process_batch` in groups.
+
+    Callers block in `_wait_for` until the batch holding their item has been
+    processed, so request threads arriving together share one call. A lone
+    item is processed at once; during a burst a batch is processed after
+    `max_delay` seconds or once it holds `max_batch` items.
+    """
+
+    def __init__(self, name, max_batch=256, max_delay=0.002):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def process_batch(self, batch):
+        """Set `value` or `error` on every PendingItem in the batch"""
+        raise NotImplementedError
+
+    def _wait_for(self, item):
+        """Queue one item and return its PendingItem once its batch is done"""
+        pending = PendingItem(item)
+        self._queue.put(pending)
+        pending.done.wait()
+        return pending
+
+    def _drain(self, batch):
+        """Move every item already waiting in the queue into the batch"""
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        self._drain(batch)
+        if len(batch) == 1:
+            # Nothing to group with; don't make a lone request wait
+            return batch
+        # A burst is in progress: linger briefly so it lands in one call
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+            self._drain(batch)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self.process_batch(batch)
+            finally:
+                for pending in batch:
+                    pending.done.set()
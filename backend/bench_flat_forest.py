@@ -0,0 +1,49 @@
+import sys
+import time
+
+import joblib
+import numpy as np
+
+from flat_forest import FlatForest
+
+# Rows per predict call: one request, a page of rosters, one day's full roster enumeration
+BATCH_SIZES = [1, 100, 53_130]
+# Minimum time spent timing each batch size
+MIN_SECONDS = 2.0
+
+
+def per_call_ms(predict, X):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        predict(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return elapsed / calls * 1000
+
+
+def run(model_path):
+    model = joblib.load(model_path)
+    forest = FlatForest.from_model(model)
+    if forest is None:
+        print(f"{model_path} is not a random forest or regression tree")
+        return False
+    print(f"{model_path}: {forest.n_trees} trees, {len(forest.value)} nodes, depth {forest.max_depth}")
+
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>8} {'sklearn (ms)':>13} {'flat (ms)':>10} {'speedup':>8} {'identical':>10}")
+    all_identical = True
+    for batch_size in BATCH_SIZES:
+        X = rng.normal(size=(batch_size, model.n_features_in_))
+        identical = np.array_equal(forest.predict(X), model.predict(X))
+        all_identical = all_identical and identical
+        sklearn_ms = per_call_ms(model.predict, X)
+        flat_ms = per_call_ms(forest.predict, X)
+        print(f"{batch_size:>8} {sklearn_ms:>13.3f} {flat_ms:>10.3f} {sklearn_ms / flat_ms:>7.1f}x {str(identical):>10}")
+    return all_identical
+
+
+if __name__ == '__main__':
+    # Usage: python bench_flat_forest.py [model.joblib]  (run from the deploy directory)
+    sys.exit(0 if run(sys.argv[1] if len(sys.argv) > 1 else 'nba_win_predictor.joblib') else 1)
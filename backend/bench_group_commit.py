@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from bench_helpers import sample_record
+from submission_store import SubmissionLog, SqliteSubmissionStore
+from submission_keys import SubmissionKeyIndex
+from submission_writer import GroupCommitWriter
+
+# Concurrent clients to measure
+CLIENT_COUNTS = [1, 8, 64]
+# Submits made by each client
+SUBMITS_PER_CLIENT = 200
+
+
+def measure(submit, clients):
+    """Return submits per second with `clients` threads calling `submit`"""
+    def client(client_id):
+        for i in range(SUBMITS_PER_CLIENT):
+            submit(sample_record('2099-01-01', f"c{client_id}-{i}"))
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return clients * SUBMITS_PER_CLIENT / (time.perf_counter() - start)
+
+
+def run():
+    # Keep the files on the real disk so fsync cost is included
+    workdir = tempfile.mkdtemp(dir='.')
+    try:
+        stores = {
+            'jsonl': lambda name: SubmissionLog(os.path.join(workdir, name + '.jsonl')),
+            'sqlite': lambda name: SqliteSubmissionStore(os.path.join(workdir, name + '.db'))
+        }
+        print(f"{'store':>8} {'clients':>8} {'direct/s':>10} {'grouped/s':>10}")
+        for store_name, make_store in stores.items():
+            for clients in CLIENT_COUNTS:
+                direct = measure(make_store(f'direct{clients}').add, clients)
+                store = make_store(f"grouped{clients}")
+                writer = GroupCommitWriter(store, SubmissionKeyIndex())
+                grouped = measure(writer.submit, clients)
+                print(f"{store_name:>8} {clients:>8} {direct:>10.0f} {grouped:>10.0f}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,16 @@
+from submission_store import make_record
+
+# Roster and team stats shared by every benchmark submission
+SAMPLE_PLAYER_IDS = [203999, 203954, 1628983, 1629029, 201939]
+SAMPLE_STATS = {'points': 100.0, 'rebounds': 40.0, 'assists': 25.0}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of timings"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def sample_record(submission_date, nickname):
+    """A submission record with the sample roster, ready for a store"""
+    return make_record(submission_date, nickname, SAMPLE_PLAYER_IDS, 'bench', {}, 41.0, SAMPLE_STATS)
@@ -0,0 +1,52 @@
+import threading
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from prediction_batcher import MicroBatchPredictor
+
+# Concurrent request threads to measure
+CLIENT_COUNTS = [1, 8, 32]
+# Single-row predictions made by each client
+PREDICTIONS_PER_CLIENT = 50
+# Forest shaped like the heavy win models: 500 trees over the 9 team features
+N_ESTIMATORS = 500
+MAX_DEPTH = 25
+
+
+def train_forest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 9))
+    y = 41 + 8 * X[:, 0] - 3 * X[:, 5] + rng.normal(size=2000)
+    forest = RandomForestRegressor(n_estimators=N_ESTIMATORS, max_depth=MAX_DEPTH, random_state=42)
+    return forest.fit(X, y), X
+
+
+def measure(predict_one, rows, clients):
+    """Return predictions per second with `clients` threads calling `predict_one`"""
+    def client(client_id):
+        for i in range(PREDICTIONS_PER_CLIENT):
+            predict_one(rows[(client_id * PREDICTIONS_PER_CLIENT + i) % len(rows)][None, :])
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return clients * PREDICTIONS_PER_CLIENT / (time.perf_counter() - start)
+
+
+def run():
+    forest, rows = train_forest()
+    batcher = MicroBatchPredictor(forest.predict)
+    print(f"{'clients':>8} {'direct/s':>10} {'batched/s':>10}")
+    for clients in CLIENT_COUNTS:
+        direct = measure(lambda features: forest.predict(features)[0], rows, clients)
+        batched = measure(batcher.predict_one, rows, clients)
+        print(f"{clients:>8} {direct:>10.0f} {batched:>10.0f}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,35 @@
+import time
+
+import joblib
+import numpy as np
+
+from bench_helpers import percentile
+from roster_optimizer import optimal_roster
+from win_model import WinPredictor
+
+# (pool size, roster size, budget) game variants to solve
+VARIANTS = [(25, 5, 15), (50, 8, 24), (100, 10, 30), (200, 10, 30)]
+# Timed solves per variant
+SOLVES_PER_VARIANT = 20
+
+
+def run():
+    predictor = WinPredictor(joblib.load('best_model.joblib'), joblib.load('scaler.joblib'))
+    rng = np.random.default_rng(0)
+    print(f"{'pool':>6} {'slots':>6} {'budget':>7} {'method':>13} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for pool_size, roster_size, budget in VARIANTS:
+        samples = []
+        for _ in range(SOLVES_PER_VARIANT):
+            # Random per-player stats shaped like the player CSV columns
+            stats = np.abs(rng.normal(loc=[15, 5, 3, 1, 0.5, 2, 0.45, 0.75, 0.35], scale=0.3, size=(pool_size, 9)))
+            costs = rng.integers(1, 6, size=pool_size)
+            start = time.perf_counter()
+            _, _, method, _ = optimal_roster(predictor, stats, costs, budget, roster_size)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"{pool_size:>6} {roster_size:>6} {budget:>7} {method:>13} "
+              f"{percentile(samples, 50):>10.3f} {percentile(samples, 99):>10.3f}")
+
+
+if __name__ == '__main__':
+    # Run from the deploy directory, next to best_model.joblib and scaler.joblib
+    run()
@@ -0,0 +1,54 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Rosters scored through /api/predict/batch in one request
+BATCH_SIZE = 10_000
+# Rosters scored one /api/predict call at a time (throughput is per roster)
+SINGLE_CALLS = 1_000
+
+
+def run():
+    workdir = tempfile.mkdtemp(dir='.')
+    try:
+        # Keep the app's stores out of the deploy directory
+        os.environ['SUBMISSION_STORE'] = 'jsonl'
+        os.environ['SUBMISSIONS_LOG'] = os.path.join(workdir, 'submissions.jsonl')
+        os.environ['ROSTER_DISTRIBUTION_DIR'] = os.path.join(workdir, 'roster_distributions')
+        os.environ['POPULARITY_SKETCH_DIR'] = os.path.join(workdir, 'sketches')
+        from app import app
+        client = app.test_client()
+
+        pool_ids = [player['Player ID'] for player in client.get('/api/players').get_json()]
+        rng = np.random.default_rng(0)
+        rosters = [[int(player_id) for player_id in rng.choice(pool_ids, 5, replace=False)]
+                   for _ in range(BATCH_SIZE)]
+
+        start = time.perf_counter()
+        for roster in rosters[:SINGLE_CALLS]:
+            client.post('/api/predict', json={'players': roster})
+        single_rate = SINGLE_CALLS / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = client.post('/api/predict/batch', json={'rosters': rosters})
+        batch_rate = BATCH_SIZE / (time.perf_counter() - start)
+        if response.status_code != 200:
+            print(f"batch request failed: {response.status_code} {response.get_data(as_text=True)}")
+            return False
+
+        print(f"{'path':>8} {'rosters/s':>12}")
+        print(f"{'single':>8} {single_rate:>12.0f}")
+        print(f"{'batch':>8} {batch_rate:>12.0f}")
+        print(f"speedup at N={BATCH_SIZE}: {batch_rate / single_rate:.0f}x")
+        return True
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    # Run from the deploy directory, next to the model files and player CSV
+    sys.exit(0 if run() else 1)
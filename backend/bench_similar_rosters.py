@@ -0,0 +1,41 @@
+import itertools
+import random
+import time
+
+from bench_helpers import percentile
+from roster_similarity import RosterSimilarityIndex
+
+# Submissions per day to measure similarity searches against
+DAY_SIZES = [1_000, 10_000, 100_000]
+# Number of timed searches per day size
+SEARCHES_PER_SIZE = 200
+
+POOL_SIZE = 25
+ROSTER_SIZE = 5
+
+
+def seed_index(count, rng):
+    """Index `count` random 5-of-25 rosters for one date"""
+    index = RosterSimilarityIndex()
+    for i in range(count):
+        mask = sum(1 << bit for bit in rng.sample(range(POOL_SIZE), ROSTER_SIZE))
+        index.add({'submission_date': '2099-01-01', 'nickname': f"user{i}",
+                   'roster_mask': mask, 'predicted_wins': rng.uniform(20, 60)})
+    return index
+
+
+def run():
+    rng = random.Random(0)
+    print(f"{'day size':>10} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for size in DAY_SIZES:
+        index = seed_index(size, rng)
+        samples = []
+        for nickname in itertools.islice(itertools.cycle(f"user{i}" for i in range(size)), SEARCHES_PER_SIZE):
+            start = time.perf_counter()
+            index.similar('2099-01-01', nickname)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"{size:>10} {percentile(samples, 50):>10.3f} {percentile(samples, 99):>10.3f}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,49 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from bench_helpers import percentile, sample_record
+from submission_store import SubmissionLog
+
+# Number of stored submissions to measure submit latency against
+HISTORY_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# Number of timed submits per history size
+SUBMITS_PER_SIZE = 500
+
+
+def seed_log(path, count):
+    """Write `count` historical submissions straight to the log file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            record = sample_record(f"2024-{i % 12 + 1:02d}-01", f"user{i}")
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def run():
+    workdir = tempfile.mkdtemp()
+    try:
+        print(f"{'history':>10} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+        for size in HISTORY_SIZES:
+            path = os.path.join(workdir, f'submissions_{size}.jsonl')
+            seed_log(path, size)
+            log = SubmissionLog(path)
+            # Warm the duplicate-check index so only the submit path is timed
+            log.add(sample_record('2099-01-01', 'warmup'))
+
+            samples = []
+            for i in range(SUBMITS_PER_SIZE):
+                record = sample_record('2099-01-02', f"bench{i}")
+                start = time.perf_counter()
+                log.add(record)
+                samples.append((time.perf_counter() - start) * 1000)
+
+            print(f"{size:>10} {percentile(samples, 50):>10.3f} {percentile(samples, 99):>10.3f}")
+            os.remove(path)
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    run()
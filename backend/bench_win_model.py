@@ -0,0 +1,45 @@
+import time
+
+import joblib
+import numpy as np
+
+from win_model import WinPredictor
+
+# Single-row predictions timed per path
+CALLS = 20_000
+# Rows compared between the folded and sklearn paths
+CHECK_ROWS = 100_000
+
+
+def per_call_us(predict, row):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        predict(row)
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+def run():
+    model = joblib.load('best_model.joblib')
+    scaler = joblib.load('scaler.joblib')
+    predictor = WinPredictor(model, scaler)
+    if not predictor.folded:
+        print("best_model.joblib is not linear; nothing to compare")
+        return
+
+    rng = np.random.default_rng(0)
+    rows = scaler.mean_ + scaler.scale_ * rng.normal(size=(CHECK_ROWS, len(scaler.mean_)))
+    difference = np.abs(predictor.predict(rows) - model.predict(scaler.transform(rows)))
+    print(f"max |folded - sklearn| over {CHECK_ROWS} rows: {difference.max():.3e}")
+
+    row = rows[:1]
+    sklearn_us = per_call_us(lambda features: model.predict(scaler.transform(features))[0], row)
+    folded_us = per_call_us(lambda features: predictor.predict(features)[0], row)
+    print(f"{'path':>8} {'us/call':>10}")
+    print(f"{'sklearn':>8} {sklearn_us:>10.2f}")
+    print(f"{'folded':>8} {folded_us:>10.2f}")
+    print(f"speedup: {sklearn_us / folded_us:.0f}x")
+
+
+if __name__ == '__main__':
+    # Run from the deploy directory, next to best_model.joblib and scaler.joblib
+    run()
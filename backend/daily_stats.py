@@ -0,0 +1,97 @@
+import threading
+from collections import Counter
+
+# Number of complete rosters reported as most popular
+TOP_ROSTERS = 10
+
+
+class DayCounters:
+    """Running pick counts, win sums and roster popularity for one date"""
+
+    def __init__(self, top_rosters=TOP_ROSTERS):
+        self.top_rosters = top_rosters
+        self.nicknames = set()
+        self.submissions = 0
+        self.pick_counts = Counter()
+        self.win_sums = Counter()
+        # Keyed by roster_hash; roster_players keeps the IDs behind each hash
+        self.roster_counts = Counter()
+        self.roster_players = {}
+        # Exact top-N rosters; counts only grow, so checking the roster that
+        # was just incremented is enough to keep this current
+        self.top = {}
+
+    def add(self, record):
+        if record['nickname'] in self.nicknames:
+            return False
+        self.nicknames.add(record['nickname'])
+        self.submissions += 1
+        for player_id in record['player_ids']:
+            self.pick_counts[player_id] += 1
+            self.win_sums[player_id] += record['predicted_wins']
+
+        roster = record['roster_hash']
+        if roster not in self.roster_players:
+            self.roster_players[roster] = sorted(record['player_ids'])
+        self.roster_counts[roster] += 1
+        count = self.roster_counts[roster]
+        if roster in self.top or len(self.top) < self.top_rosters:
+            self.top[roster] = count
+        else:
+            weakest = min(self.top, key=self.top.get)
+            if count > self.top[weakest]:
+                del self.top[weakest]
+                self.top[roster] = count
+        return True
+
+    def popular_rosters(self):
+        return [{'player_ids': self.roster_players[roster], 'roster_hash': roster, 'count': count}
+                for roster, count in sorted(self.top.items(), key=lambda item: -item[1])]
+
+
+class DailyStats:
+    """Per-date submission analytics, updated as submissions are indexed.
+
+    Register `add` as a LeaderboardIndex listener and `evict` as its evict
+    callback; records seen twice (for example when a past board is reloaded)
+    are only counted once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._days = {}
+
+    def add(self, record):
+        with self._lock:
+            counters = self._days.get(record['submission_date'])
+            if counters is None:
+                counters = self._days[record['submission_date']] = DayCounters()
+            counters.add(record)
+
+    def evict(self, submission_date):
+        """Forget a date whose leaderboard the index has dropped"""
+        with self._lock:
+            self._days.pop(submission_date, None)
+
+    def summary(self, submission_date, pool):
+        """Return pick rate and average wins for each pool player, plus popular rosters"""
+        with self._lock:
+            counters = self._days.get(submission_date) or DayCounters()
+            players = []
+            for player in pool:
+                player_id = int(player['Player ID'])
+                picks = counters.pick_counts[player_id]
+                players.append({
+                    'player_id': player_id,
+                    'name': player.get('Full Name'),
+                    'dollar_value': player.get('Dollar Value'),
+                    'picks': picks,
+                    'pick_rate': picks / counters.submissions if counters.submissions else 0.0,
+                    'avg_predicted_wins': counters.win_sums[player_id] / picks if picks else None
+                })
+            return {
+                'date': submission_date,
+                'submissions': counters.submissions,
+                'players': players,
+                'popular_rosters': counters.popular_rosters()
+            }
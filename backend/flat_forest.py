@@ -0,0 +1,114 @@
+import sys
+
+import joblib
+import numpy as np
+
+# Upper bound on (rows x trees) traversed at once, to bound temporary memory
+CHUNK_CELLS = 1 << 18
+
+
+class FlatForest:
+    """A fitted sklearn tree ensemble flattened into contiguous NumPy arrays.
+
+    Every tree's nodes are stored back to back: `feature`, `threshold` and
+    `value` per node, and `children[node] = (right, left)` as global node
+    indices. Leaves point at themselves with an infinite threshold, so a
+    batch of rows walks every tree at once, one vectorized step per level,
+    and rows that reach a leaf early simply stay there.
+
+    Predictions are identical to sklearn's: rows are compared in float32
+    like sklearn's tree code, and tree outputs are summed in estimator
+    order before dividing by the number of trees.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_model(cls, model):
+        """Flatten a fitted forest or single regression tree, or return None if it isn't one"""
+        estimators = getattr(model, 'estimators_', None)
+        if estimators is None and hasattr(model, 'tree_'):
+            estimators = [model]
+        if isinstance(estimators, np.ndarray):
+            # Gradient boosting keeps a 2-D array of stages that add up rather than average
+            return None
+        if not estimators or not all(hasattr(estimator, 'tree_') for estimator in estimators):
+            return None
+        trees = [estimator.tree_ for estimator in estimators]
+        if any(tree.n_outputs != 1 or tree.value.shape[2] != 1 for tree in trees):
+            return None
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            nodes = np.arange(tree.node_count) + offset
+            leaf = tree.children_left == -1
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            children.append(np.column_stack([
+                np.where(leaf, nodes, tree.children_right + offset),
+                np.where(leaf, nodes, tree.children_left + offset)
+            ]))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += tree.node_count
+        return cls(
+            np.concatenate(features).astype(np.int32),
+            np.concatenate(thresholds).astype(np.float64),
+            np.concatenate(children).astype(np.int32),
+            np.concatenate(values).astype(np.float64),
+            np.array(roots, dtype=np.int32),
+            max(tree.max_depth for tree in trees)
+        )
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            np.savez(f, feature=self.feature, threshold=self.threshold, children=self.children,
+                     value=self.value, roots=self.roots, max_depth=np.int64(self.max_depth))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['feature'], data['threshold'], data['children'], data['value'],
+                       data['roots'], int(data['max_depth']))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _predict_chunk(self, X):
+        rows = np.arange(len(X))[:, None]
+        node = np.tile(self.roots, (len(X), 1))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = self.children[node, go_left.view(np.int8)]
+        # cumsum adds the trees in order, like sklearn's running total
+        return self.value[node].cumsum(axis=1)[:, -1] / self.n_trees
+
+    def predict(self, X):
+        """Predict each row of an (N, features) matrix"""
+        X = np.asarray(X, dtype=np.float32)
+        chunk = max(1, CHUNK_CELLS // self.n_trees)
+        if len(X) <= chunk:
+            return self._predict_chunk(X)
+        return np.concatenate([self._predict_chunk(X[start:start + chunk])
+                               for start in range(0, len(X), chunk)])
+
+
+if __name__ == '__main__':
+    # Usage: python flat_forest.py export <model.joblib> <forest.npz>
+    if len(sys.argv) != 4 or sys.argv[1] != 'export':
+        print("Usage: python flat_forest.py export <model.joblib> <forest.npz>")
+        sys.exit(1)
+    forest = FlatForest.from_model(joblib.load(sys.argv[2]))
+    if forest is None:
+        print(f"{sys.argv[2]} is not a random forest or regression tree")
+        sys.exit(1)
+    forest.save(sys.argv[3])
+    print(f"Exported {forest.n_trees} trees ({len(forest.value)} nodes) to {sys.argv[3]}")
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+import pytz
+
+# The daily pool, submissions and leaderboards all turn over at midnight US/Eastern
+GAME_TIMEZONE = pytz.timezone('US/Eastern')
+# Days before today that may still receive submissions (writes in flight around midnight)
+OPEN_DAYS = 1
+
+
+def game_now():
+    """Current time in the game's timezone"""
+    return datetime.now(GAME_TIMEZONE)
+
+
+def game_today():
+    """Today's game date, whatever the server's local timezone"""
+    return game_now().date()
+
+
+def game_date():
+    """Today's game date as YYYY-MM-DD, the format submission dates are stored in"""
+    return game_today().isoformat()
+
+
+def is_closed_date(date_str):
+    """True if a YYYY-MM-DD date is older than every date that can still change"""
+    try:
+        date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return False
+    return date < game_today() - timedelta(days=OPEN_DAYS)
+
+
+def seconds_until_next_game_date():
+    """Seconds until the next midnight in the game's timezone"""
+    now = game_now()
+    midnight = GAME_TIMEZONE.localize(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+    return (midnight - now).total_seconds()
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from sortedcontainers import SortedList
+
+from game_dates import is_closed_date
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def leaderboard_key(record):
+    """Sort key for a leaderboard: most predicted wins, then earliest submission"""
+    return (-record['predicted_wins'], record.get('created_at') or '', record['nickname'])
+
+
+def record_digest(record):
+    """64-bit hash of the parts of a record that a leaderboard response shows"""
+    content = json.dumps([record['nickname'], record['player_ids'], record['results'],
+                          record['predicted_wins'], record['team_stats']],
+                         sort_keys=True, separators=(',', ':'))
+    return int.from_bytes(hashlib.blake2b(content.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class DailyLeaderboard:
+    """Submissions for one date, kept sorted by leaderboard_key"""
+
+    def __init__(self):
+        self.keys = SortedList()
+        self.records = {}
+        # Bumped on every accepted submission; boards only grow, so this
+        # matches across workers that have seen the same submissions
+        self.version = 0
+        # Sum of record digests mod 2**64: order-independent, so workers that
+        # indexed the same submissions in any order agree on it
+        self.digest = 0
+
+    def add(self, record):
+        """Insert a record in O(log n); returns False if the nickname is already ranked"""
+        nickname = record['nickname']
+        if nickname in self.records:
+            return False
+        self.records[nickname] = record
+        self.keys.add(leaderboard_key(record))
+        self.version += 1
+        self.digest = (self.digest + record_digest(record)) & 0xFFFFFFFFFFFFFFFF
+        return True
+
+    def __len__(self):
+        return len(self.keys)
+
+    def ranked(self, start=0, stop=None):
+        """Return the records ranked in [start, stop), best first"""
+        return [self.records[key[2]] for key in self.keys.islice(start, stop)]
+
+    def rank(self, nickname):
+        """Return the 0-based rank of a nickname in O(log n), or None if absent"""
+        record = self.records.get(nickname)
+        if record is None:
+            return None
+        return self.keys.bisect_left(leaderboard_key(record))
+
+
+class LeaderboardIndex:
+    """In-process per-date leaderboards built from a SubmissionStore.
+
+    The index is loaded once from the store and then only tails it: submits
+    handled by this process are inserted directly, and `refresh` picks up
+    anything other workers have written. Reads refresh at most once every
+    `refresh_interval` seconds, so most reads never touch the store.
+
+    With a date-partitioned store only the open days are tailed; a past
+    date's board is read from its own segment on first request and kept in
+    a small LRU of `max_past_boards` boards. Open boards join that LRU once
+    their day closes, and listeners are told to drop a date whenever its
+    board leaves it.
+    """
+
+    def __init__(self, store, refresh_interval=1.0, max_past_boards=32):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.max_past_boards = max_past_boards
+        self._lock = threading.Lock()
+        self._boards = {}
+        self._past_boards = OrderedDict()
+        self._cursor = None
+        self._refreshed_at = 0.0
+        self._listeners = []
+        self._evictors = []
+        self.refresh()
+        logger.info(f"Built leaderboard index for {len(self._boards)} dates")
+
+    def _add(self, record):
+        board = self._boards.get(record['submission_date'])
+        if board is None:
+            board = self._boards[record['submission_date']] = DailyLeaderboard()
+        if not board.add(record):
+            return False
+        for listener in self._listeners:
+            listener(record)
+        return True
+
+    def add_listener(self, listener, evict=None):
+        """Call `listener(record)` for every record indexed from now on, after
+        replaying the records already indexed, and `evict(date)` when a past
+        date's board is dropped so the listener can free that date too"""
+        with self._lock:
+            for board in self._boards.values():
+                for record in board.records.values():
+                    listener(record)
+            self._listeners.append(listener)
+            if evict is not None:
+                self._evictors.append(evict)
+
+    def _cache_past_board(self, submission_date, board):
+        self._past_boards[submission_date] = board
+        while len(self._past_boards) > self.max_past_boards:
+            evicted, _ = self._past_boards.popitem(last=False)
+            for evict in self._evictors:
+                evict(evicted)
+
+    def _retire_closed_boards(self):
+        """Move boards whose day has closed into the past-board LRU"""
+        for submission_date in [d for d in self._boards if is_closed_date(d)]:
+            self._cache_past_board(submission_date, self._boards.pop(submission_date))
+
+    def add(self, record):
+        """Index a record that was just accepted by the store"""
+        with self._lock:
+            return self._add(record)
+
+    def refresh(self):
+        """Index records written to the store since the last refresh"""
+        with self._lock:
+            records, self._cursor = self.store.read_open_since(self._cursor)
+            self._refreshed_at = time.monotonic()
+            for record in records:
+                self._add(record)
+            if self.store.date_partitioned:
+                self._retire_closed_boards()
+            return len(records)
+
+    def keys(self):
+        """Return every indexed (submission_date, nickname) pair"""
+        with self._lock:
+            return [(date, nickname) for date, board in self._boards.items() for nickname in board.records]
+
+    def _past_board(self, submission_date):
+        """Load a closed day's board from its own segment, keeping recent ones cached"""
+        with self._lock:
+            board = self._past_boards.get(submission_date)
+            if board is not None:
+                self._past_boards.move_to_end(submission_date)
+                return board
+        board = DailyLeaderboard()
+        for record in self.store.read_date(submission_date):
+            board.add(record)
+            for listener in self._listeners:
+                listener(record)
+        with self._lock:
+            self._cache_past_board(submission_date, board)
+        return board
+
+    def get(self, submission_date):
+        """Return the date's leaderboard, or an empty one"""
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            self.refresh()
+        board = self._boards.get(submission_date)
+        if board is None and self.store.date_partitioned:
+            return self._past_board(submission_date)
+        return board or DailyLeaderboard()
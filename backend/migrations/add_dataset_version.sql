@@ -0,0 +1,2 @@
+-- Rosters are stored as player IDs; record which player dataset they refer to
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS dataset_version VARCHAR(40);
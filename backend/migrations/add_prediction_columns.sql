@@ -0,0 +1,3 @@
+-- Store the model output and team totals alongside each submission
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS predicted_wins DOUBLE PRECISION NOT NULL DEFAULT 0;
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS team_stats JSONB NOT NULL DEFAULT '{}';
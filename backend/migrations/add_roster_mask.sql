@@ -0,0 +1,3 @@
+-- Roster as a 25-bit mask over the day's pool, plus an order-independent roster hash
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS roster_mask INTEGER;
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS roster_hash VARCHAR(16);
@@ -0,0 +1,84 @@
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+from roster_space import player_stat_matrix, team_feature_matrix
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# CSV holding every player the game can draw from
+PLAYER_DATA_FILE = 'nba_players_final_updated.csv'
+
+
+class PlayerTable:
+    """In-memory player data keyed by player ID.
+
+    `stats` holds the columns team features are built from as a float32
+    matrix, one row per player, with `rows` mapping player ID to row.
+    """
+
+    def __init__(self, df, version):
+        self.df = df
+        self.version = version
+        self.by_id = {}
+        self.rows = {}
+        records = df.to_dict('records')
+        for row, player in enumerate(records):
+            self.by_id[int(player['Player ID'])] = player
+            self.rows[int(player['Player ID'])] = row
+        self.stats = player_stat_matrix(records).astype(np.float32)
+        # Sorted IDs for vectorized ID -> row lookups
+        ids = np.array([int(player['Player ID']) for player in records], dtype=np.int64)
+        self._sorted_rows = np.argsort(ids, kind='stable')
+        self._sorted_ids = ids[self._sorted_rows]
+
+    @classmethod
+    def load(cls, path=PLAYER_DATA_FILE):
+        with open(path, 'rb') as f:
+            # The dataset version identifies the exact CSV a roster was scored against
+            version = hashlib.sha1(f.read()).hexdigest()[:12]
+        df = pd.read_csv(path)
+        logger.info(f"Loaded {len(df)} players from {path} (version {version})")
+        return cls(df, version)
+
+    def __contains__(self, player_id):
+        return player_id in self.by_id
+
+    def stats_of(self, player_ids):
+        """Return the stat rows of known player IDs, in the order given"""
+        return self.stats[[self.rows[player_id] for player_id in player_ids]]
+
+    def team_features(self, player_ids):
+        """Return the (1, 9) team feature row of a roster given as known player IDs"""
+        return self.roster_features([player_ids])
+
+    def rows_of(self, player_ids):
+        """Map an array of player IDs to stat rows in one search; unknown IDs map to -1"""
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        positions = np.searchsorted(self._sorted_ids, player_ids).clip(max=len(self._sorted_ids) - 1)
+        rows = self._sorted_rows[positions]
+        rows[self._sorted_ids[positions] != player_ids] = -1
+        return rows
+
+    def roster_features(self, rosters):
+        """Return the (N, 9) team feature matrix of an (N, roster size) array of known player IDs"""
+        rows = self.rows_of(rosters)
+        if (rows < 0).any():
+            raise KeyError(f"Unknown player IDs: {sorted(set(np.asarray(rosters)[rows < 0].tolist()))}")
+        return team_feature_matrix(self.stats, rows)
+
+    def lookup(self, player_ids):
+        """Return the player records for a list of IDs, skipping unknown IDs"""
+        return [self.by_id[player_id] for player_id in player_ids if player_id in self.by_id]
+
+
+# Load the player data
+try:
+    player_table = PlayerTable.load()
+except Exception as e:
+    logger.error(f"Error loading player data: {str(e)}")
+    raise
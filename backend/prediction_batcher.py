@@ -0,0 +1,42 @@
+import logging
+
+import numpy as np
+
+from batching import QueueBatcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchPredictor(QueueBatcher):
+    """Background thread that scores concurrent single-row predictions together.
+
+    `predict(features)` maps an (N, features) matrix to N predictions.
+    Callers block in `predict_one` until the batch holding their row has
+    been scored, so request threads arriving together share one vectorized
+    model call. As with GroupCommitWriter, a lone request is scored at once;
+    during a burst a batch is scored after `max_delay` seconds or once it
+    holds `max_batch` rows.
+    """
+
+    def __init__(self, predict, max_batch=256, max_delay=0.002):
+        self.predict = predict
+        super().__init__('prediction-batcher', max_batch, max_delay)
+
+    def predict_one(self, features):
+        """Queue one feature row and wait for its prediction"""
+        pending = self._wait_for(features)
+        if pending.error is not None:
+            raise pending.error
+        return pending.value
+
+    def process_batch(self, batch):
+        try:
+            values = self.predict(np.vstack([pending.item for pending in batch]))
+            for pending, value in zip(batch, values):
+                pending.value = value
+        except Exception as e:
+            logger.error(f"Error scoring {len(batch)} predictions: {str(e)}")
+            for pending in batch:
+                pending.error = e
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Bounded LRU of predicted wins keyed by (model version, sorted player IDs).
+
+    A roster's prediction doesn't depend on player order, so every ordering
+    shares one entry and is computed from the sorted roster. The version
+    should name both the model and the player data; a lookup with a new
+    version clears the cache, so reloading either never serves stale wins.
+    """
+
+    def __init__(self, max_size=65536):
+        self.max_size = max_size
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, version, player_ids, compute):
+        """Return the cached prediction, or `compute(sorted roster)` on a miss"""
+        key = (version, tuple(sorted(player_ids)))
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = compute(key[1])
+        with self._lock:
+            # Skip storing if the cache moved to another version meanwhile
+            if version == self.version:
+                self._entries[key] = value
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+
+from roster_space import team_feature_matrix, valid_rosters
+
+# Largest roster space a non-linear model is scored on exhaustively
+EXHAUSTIVE_LIMIT = 250_000
+# Local search bounds for larger spaces
+SEARCH_RESTARTS = 4
+SEARCH_ROUNDS = 50
+# Largest knapsack table (players x slots x budget) allocated for one solve
+MAX_KNAPSACK_CELLS = 2_000_000
+
+
+def knapsack(values, costs, budget, roster_size):
+    """Exact best roster: maximize the sum of values with exactly roster_size
+    players and total cost <= budget. Returns sorted positions or None.
+
+    dp[c, b] is the best value of c players costing at most b; each player
+    updates every (c, b) cell at once, so this is O(players * size * budget)
+    in a handful of vectorized steps.
+    """
+    costs = [int(cost) for cost in costs]
+    # No roster can spend more than its roster_size most expensive players
+    budget = min(budget, sum(sorted(costs)[-roster_size:]))
+    if len(values) * (roster_size + 1) * (budget + 1) > MAX_KNAPSACK_CELLS:
+        raise ValueError(f"Knapsack of {len(values)} players, {roster_size} slots and "
+                         f"${budget} budget is too large")
+    dp = np.full((roster_size + 1, budget + 1), -np.inf)
+    dp[0, :] = 0.0
+    taken = np.zeros((len(values), roster_size + 1, budget + 1), dtype=bool)
+    for i, (value, cost) in enumerate(zip(values, costs)):
+        if cost > budget:
+            continue
+        candidate = np.full_like(dp, -np.inf)
+        candidate[1:, cost:] = dp[:-1, :budget + 1 - cost] + value
+        taken[i] = candidate > dp
+        dp = np.where(taken[i], candidate, dp)
+    if not np.isfinite(dp[roster_size, budget]):
+        return None
+
+    roster = []
+    slots, remaining = roster_size, budget
+    for i in range(len(values) - 1, -1, -1):
+        if slots and taken[i, slots, remaining]:
+            roster.append(i)
+            slots -= 1
+            remaining -= costs[i]
+    return sorted(roster)
+
+
+def local_search(score, stats, costs, budget, roster_size, seed=0):
+    """Bounded swap search for models without additive structure.
+
+    From a few feasible starting rosters, repeatedly scores every
+    single-player swap that stays within budget in one batch and moves to the
+    best one, until no swap helps or SEARCH_ROUNDS is reached.
+    """
+    costs = np.asarray(costs, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    cheapest = np.argsort(costs, kind='stable')[:roster_size]
+    if costs[cheapest].sum() > budget:
+        return None, None
+    starts = [np.sort(cheapest)]
+    for _ in range(SEARCH_RESTARTS * 20):
+        if len(starts) > SEARCH_RESTARTS:
+            break
+        roster = np.sort(rng.choice(len(costs), roster_size, replace=False))
+        if costs[roster].sum() <= budget:
+            starts.append(roster)
+
+    best_roster, best_wins = None, -np.inf
+    for roster in starts:
+        wins = float(score(team_feature_matrix(stats, roster[None, :]))[0])
+        for _ in range(SEARCH_ROUNDS):
+            outside = np.setdiff1d(np.arange(len(costs)), roster)
+            # Every (slot, replacement) pair as a candidate roster
+            candidates = np.repeat(roster[None, :], roster_size * len(outside), axis=0)
+            slots = np.repeat(np.arange(roster_size), len(outside))
+            candidates[np.arange(len(candidates)), slots] = np.tile(outside, roster_size)
+            candidates = candidates[costs[candidates].sum(axis=1) <= budget]
+            if not len(candidates):
+                break
+            candidate_wins = score(team_feature_matrix(stats, candidates))
+            best = int(np.argmax(candidate_wins))
+            if candidate_wins[best] <= wins:
+                break
+            roster, wins = np.sort(candidates[best]), float(candidate_wins[best])
+        if wins > best_wins:
+            best_roster, best_wins = roster, wins
+    return [int(i) for i in best_roster], best_wins
+
+
+def optimal_roster(predictor, stats, costs, budget, roster_size):
+    """Return (positions, raw predicted wins, method, exact) for the best affordable roster.
+
+    `predictor` is a WinPredictor. Folded linear models are solved exactly
+    by knapsack over per-player contributions; other models are scored
+    exhaustively when the roster space is small enough, and by bounded local
+    search otherwise.
+    """
+    if roster_size <= 0 or roster_size > len(costs):
+        return None, None, None, False
+    if predictor.folded:
+        values = predictor.contributions(stats, roster_size)
+        roster = knapsack(values, costs, budget, roster_size)
+        if roster is None:
+            return None, None, 'knapsack', True
+        return roster, predictor.bias + float(values[roster].sum()), 'knapsack', True
+
+    if math.comb(len(costs), roster_size) <= EXHAUSTIVE_LIMIT:
+        rosters = valid_rosters(costs, budget, roster_size)
+        if not len(rosters):
+            return None, None, 'exhaustive', True
+        wins = predictor.predict(team_feature_matrix(stats, rosters))
+        best = int(np.argmax(wins))
+        return [int(i) for i in rosters[best]], float(wins[best]), 'exhaustive', True
+
+    roster, wins = local_search(predictor.predict, stats, costs, budget, roster_size)
+    return roster, wins, 'local_search', False
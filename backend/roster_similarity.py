@@ -0,0 +1,101 @@
+import threading
+
+import numpy as np
+
+# Number of similar rosters returned when no limit is given
+DEFAULT_SIMILAR_LIMIT = 10
+
+
+def popcount32(values):
+    """Vectorized bit count of a uint32 array (SWAR, no lookup table)"""
+    values = values - ((values >> 1) & np.uint32(0x55555555))
+    values = (values & np.uint32(0x33333333)) + ((values >> 2) & np.uint32(0x33333333))
+    values = (values + (values >> 4)) & np.uint32(0x0F0F0F0F)
+    return (values * np.uint32(0x01010101)) >> 24
+
+
+class DayRosterMasks:
+    """Growable arrays of one date's roster masks, predicted wins and nicknames"""
+
+    def __init__(self, capacity=1024):
+        self.masks = np.zeros(capacity, dtype=np.uint32)
+        self.wins = np.zeros(capacity, dtype=np.float64)
+        self.nicknames = []
+        self.rows = {}
+
+    def __len__(self):
+        return len(self.nicknames)
+
+    def add(self, nickname, mask, wins):
+        if nickname in self.rows:
+            return False
+        size = len(self.nicknames)
+        if size == len(self.masks):
+            self.masks = np.concatenate([self.masks, np.zeros(size, dtype=np.uint32)])
+            self.wins = np.concatenate([self.wins, np.zeros(size, dtype=np.float64)])
+        self.masks[size] = mask
+        self.wins[size] = wins
+        self.rows[nickname] = size
+        self.nicknames.append(nickname)
+        return True
+
+
+class RosterSimilarityIndex:
+    """Per-date roster masks for "teams like yours" searches.
+
+    Register `add` as a LeaderboardIndex listener and `evict` as its evict
+    callback. Masks are relative to the
+    date's pool, so only rosters from the same date are compared; records
+    without a mask (rosters outside the pool) are not indexed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._days = {}
+
+    def add(self, record):
+        if record.get('roster_mask') is None:
+            return
+        with self._lock:
+            day = self._days.get(record['submission_date'])
+            if day is None:
+                day = self._days[record['submission_date']] = DayRosterMasks()
+            day.add(record['nickname'], record['roster_mask'], record['predicted_wins'])
+
+    def evict(self, submission_date):
+        """Forget a date whose leaderboard the index has dropped"""
+        with self._lock:
+            self._days.pop(submission_date, None)
+
+    def similar(self, submission_date, nickname, limit=DEFAULT_SIMILAR_LIMIT):
+        """Return (nickname, jaccard, shared players) for the most similar rosters,
+        or None if the nickname has no indexed roster on that date.
+
+        Equally similar rosters are ordered by predicted wins, then by who
+        submitted first, as on the leaderboard.
+        """
+        with self._lock:
+            day = self._days.get(submission_date)
+            row = day.rows.get(nickname) if day is not None else None
+            if row is None:
+                return None
+            # Rows are only appended, so this prefix stays valid after the lock
+            size = len(day)
+            masks = day.masks[:size]
+            wins = day.wins[:size]
+            nicknames = day.nicknames[:size]
+
+        mask = masks[row]
+        shared = popcount32(masks & mask)
+        union = popcount32(masks | mask)
+        similarity = shared / np.maximum(union, 1)
+        similarity[row] = -1.0
+
+        limit = min(limit, size - 1)
+        if limit <= 0:
+            return []
+        # Only rosters at least as similar as the limit-th best can make the cut
+        cutoff = np.partition(similarity, size - limit)[size - limit]
+        candidates = np.flatnonzero(similarity >= cutoff)
+        top = candidates[np.lexsort((-wins[candidates], -similarity[candidates]))[:limit]]
+        return [(nicknames[i], float(similarity[i]), int(shared[i])) for i in top]
@@ -0,0 +1,203 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from game_dates import game_date, seconds_until_next_game_date
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Game rules: five players whose Dollar Values add up to at most the budget
+ROSTER_SIZE = 5
+BUDGET = 15
+
+# Team features in the order the model was trained on: (team stat, player column, how players combine)
+TEAM_FEATURES = [
+    ('points', 'Points Per Game (Avg)', 'sum'),
+    ('rebounds', 'Rebounds Per Game (Avg)', 'sum'),
+    ('assists', 'Assists Per Game (Avg)', 'sum'),
+    ('steals', 'Steals Per Game (Avg)', 'sum'),
+    ('blocks', 'Blocks Per Game (Avg)', 'sum'),
+    ('turnovers', 'TOV', 'sum'),
+    ('fg_pct', 'Field Goal % (Avg)', 'mean'),
+    ('ft_pct', 'Free Throw % (Avg)', 'mean'),
+    ('three_pct', 'Three Point % (Avg)', 'mean')
+]
+MEAN_FEATURES = [i for i, (_, _, how) in enumerate(TEAM_FEATURES) if how == 'mean']
+
+
+def team_stats_dict(features):
+    """Name the values of one team feature row, as stored with each submission"""
+    return {name: round(float(value), 4) for (name, _, _), value in zip(TEAM_FEATURES, features)}
+
+
+def player_stat_matrix(players):
+    """Return a (players, features) float64 matrix of the columns team features are built from"""
+    return np.array([[float(player[column]) for _, column, _ in TEAM_FEATURES] for player in players],
+                    dtype=np.float64)
+
+
+def valid_rosters(costs, budget=BUDGET, roster_size=ROSTER_SIZE):
+    """Return every affordable roster as an (M, roster_size) array of pool positions"""
+    combos = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(len(costs)), roster_size)),
+                         dtype=np.int64).reshape(-1, roster_size)
+    return combos[np.asarray(costs)[combos].sum(axis=1) <= budget]
+
+
+def team_feature_matrix(stats, rosters):
+    """Build the (M, features) team feature matrix for rosters of rows in `stats`"""
+    # Accumulate in float64 whatever the precision of the stat matrix
+    features = stats[rosters].sum(axis=1, dtype=np.float64)
+    features[:, MEAN_FEATURES] /= rosters.shape[1]
+    return features
+
+
+class RosterDistribution:
+    """Sorted raw (unclamped) predicted wins of every valid roster in one day's pool.
+
+    Raw scores keep rosters apart that clamping to 0-74 would tie, so
+    lookups must pass raw predictions too.
+    """
+
+    def __init__(self, wins):
+        self.wins = np.sort(wins)
+
+    def __len__(self):
+        return len(self.wins)
+
+    def beats_many(self, raw_wins):
+        """Percentage of possible rosters each raw prediction beats, by binary search.
+
+        Rosters predicted to win exactly as many games count as half beaten.
+        """
+        if not len(self.wins):
+            return [None] * len(raw_wins)
+        below = np.searchsorted(self.wins, raw_wins, side='left')
+        tied = np.searchsorted(self.wins, raw_wins, side='right') - below
+        return np.round(100.0 * (below + 0.5 * tied) / len(self.wins), 2).tolist()
+
+    def beats(self, raw_wins):
+        """`beats_many` for a single raw prediction"""
+        return self.beats_many([raw_wins])[0]
+
+
+class RosterDistributions:
+    """Per-date win distributions over all valid rosters, computed once per day.
+
+    `score(features)` maps an (M, features) matrix to raw predicted wins in one
+    vectorized call and `player_stats(player_ids)` returns the pool's stat
+    rows. Each distribution is saved as `<directory>/<date>.npz` together
+    with `version` (model and dataset), so every worker reuses the first
+    worker's result and a new model or player CSV triggers a rescore.
+    """
+
+    # Saved alongside `version`; bumped when the stored wins change meaning
+    # (files from before FORMAT 2 hold clamped wins)
+    FORMAT = 2
+
+    def __init__(self, score, pool_for_date, player_stats, directory, version, max_days=8):
+        self.score = score
+        self.pool_for_date = pool_for_date
+        self.player_stats = player_stats
+        self.directory = directory
+        self.version = version
+        self._saved_version = f'{self.FORMAT}.{version}'
+        self.max_days = max_days
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._days = OrderedDict()
+        # Dates being scored right now, so each is scored once
+        self._pending = set()
+
+    def _load(self, path):
+        try:
+            with np.load(path) as data:
+                if str(data['version']) == self._saved_version:
+                    return RosterDistribution(data['wins'])
+        except Exception as e:
+            logger.error(f"Error reading roster distribution {path}: {str(e)}")
+        return None
+
+    def _compute(self, submission_date, path):
+        start = time.perf_counter()
+        pool = self.pool_for_date(submission_date)
+        rosters = valid_rosters([int(player['Dollar Value']) for player in pool])
+        stats = self.player_stats([int(player['Player ID']) for player in pool])
+        distribution = RosterDistribution(self.score(team_feature_matrix(stats, rosters)))
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, wins=distribution.wins, version=np.array(self._saved_version))
+        os.replace(tmp_path, path)
+        logger.info(f"Scored {len(rosters)} valid rosters for {submission_date} "
+                    f"in {time.perf_counter() - start:.3f}s")
+        return distribution
+
+    def _store(self, submission_date, distribution):
+        with self._lock:
+            self._days[submission_date] = distribution
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+
+    def _score_date(self, submission_date):
+        """Load or compute the date's distribution, blocking until it is ready.
+
+        Scoring runs without holding the lock, so `get` keeps answering for
+        other dates (and None for this one) while a large model works.
+        """
+        with self._lock:
+            if submission_date in self._pending:
+                return None
+            self._pending.add(submission_date)
+        try:
+            path = os.path.join(self.directory, f'{submission_date}.npz')
+            distribution = (self._load(path) if os.path.exists(path) else None) or self._compute(submission_date, path)
+            self._store(submission_date, distribution)
+            return distribution
+        finally:
+            with self._lock:
+                self._pending.discard(submission_date)
+
+    def _score_in_background(self, submission_date):
+        try:
+            self._score_date(submission_date)
+        except Exception as e:
+            logger.error(f"Error scoring rosters for {submission_date}: {str(e)}")
+
+    def get(self, submission_date):
+        """Return the date's distribution, or None while it is still being scored.
+
+        A distribution already saved by any worker is loaded at once; otherwise
+        scoring starts in a background thread on first use.
+        """
+        with self._lock:
+            distribution = self._days.get(submission_date)
+            if distribution is not None:
+                self._days.move_to_end(submission_date)
+                return distribution
+            if submission_date in self._pending:
+                return None
+        path = os.path.join(self.directory, f'{submission_date}.npz')
+        distribution = self._load(path) if os.path.exists(path) else None
+        if distribution is not None:
+            self._store(submission_date, distribution)
+            return distribution
+        threading.Thread(target=self._score_in_background, args=(submission_date,),
+                         name='roster-distribution-score', daemon=True).start()
+        return None
+
+    def start_daily_job(self):
+        """Score each new day's rosters in a background thread shortly after midnight Eastern"""
+        def run():
+            while True:
+                self._score_in_background(game_date())
+                time.sleep(max(1.0, seconds_until_next_game_date()))
+
+        thread = threading.Thread(target=run, name='roster-distributions', daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,44 @@
+import hashlib
+
+
+def roster_hash(player_ids):
+    """Canonical key of a roster: order-independent and the same on every day"""
+    canonical = ','.join(str(player_id) for player_id in sorted(int(p) for p in player_ids))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def popcount(mask):
+    return bin(mask).count('1')
+
+
+def overlap(mask_a, mask_b):
+    """Number of players two rosters from the same pool share"""
+    return popcount(mask_a & mask_b)
+
+
+class PoolIndex:
+    """Bit position of each player in a day's pool.
+
+    A daily pool has 25 players, so any roster drawn from it is a 25-bit
+    integer with one bit set per selected player.
+    """
+
+    def __init__(self, player_ids):
+        self.player_ids = [int(player_id) for player_id in player_ids]
+        self.bits = {player_id: bit for bit, player_id in enumerate(self.player_ids)}
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def mask(self, player_ids):
+        """Return the roster's bitmask, or None if a player is not in the pool"""
+        mask = 0
+        for player_id in player_ids:
+            bit = self.bits.get(int(player_id))
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return mask
+
+    def player_ids_of(self, mask):
+        return [player_id for bit, player_id in enumerate(self.player_ids) if mask >> bit & 1]
@@ -1,11 +1,13 @@
 from flask import Blueprint, jsonify, request
-import pandas as pd
 import numpy as np
 from datetime import datetime
-import pytz
 import json
 import os
 import logging
+from functools import lru_cache
+from game_dates import game_now, game_today
+from player_table import player_table
+from rosters import PoolIndex
 
 players_bp = Blueprint('players', __name__)
 
@@ -16,11 +18,42 @@ logger = logging.getLogger(__name__)
 # File to store the daily pool
 DAILY_POOL_FILE = 'daily_pool.json'
 
+def select_pool(df, pool_date):
+    """Pick the 5 players per Dollar Value tier for a date (deterministic per date)"""
+    pool = []
+    for dollar_value in range(1, 6):
+        # Filter players for current dollar value
+        dollar_players = df[df['Dollar Value'] == dollar_value].copy()
+        logger.info(f"Found {len(dollar_players)} players for ${dollar_value}")
+        
+        if len(dollar_players) < 5:
+            logger.error(f"Not enough players for dollar value {dollar_value}")
+            raise ValueError(f"Not enough players for dollar value {dollar_value}")
+        
+        # Randomly select 5 players
+        selected_players = dollar_players.sample(n=5, random_state=pool_date.toordinal())
+        
+        # Add to pool
+        for _, player in selected_players.iterrows():
+            pool.append(player.to_dict())
+    return pool
+
+def pool_for_date(date_str):
+    """Return the pool for a YYYY-MM-DD date, reusing today's saved pool"""
+    pool_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    if pool_date == game_today():
+        return generate_daily_pool()
+    return select_pool(player_table.df, pool_date)
+
+@lru_cache(maxsize=64)
+def pool_index(date_str):
+    """Return the PoolIndex that maps a date's pool players to roster mask bits"""
+    return PoolIndex([player['Player ID'] for player in pool_for_date(date_str)])
+
 def generate_daily_pool():
     try:
         # Get current date in Eastern time
-        eastern = pytz.timezone('US/Eastern')
-        current_time = datetime.now(eastern)
+        current_time = game_now()
         logger.info(f"Current time: {current_time}")
         
         # Check if we need to generate a new pool
@@ -37,27 +70,9 @@ def generate_daily_pool():
                 # Continue to generate new pool if reading fails
         
         logger.info("Generating new daily pool")
-        pool = []
-        
-        # Load the player data
-        df = pd.read_csv('nba_players_final_updated.csv')
         
-        # Generate new pool
-        for dollar_value in range(1, 6):
-            # Filter players for current dollar value
-            dollar_players = df[df['Dollar Value'] == dollar_value].copy()
-            logger.info(f"Found {len(dollar_players)} players for ${dollar_value}")
-            
-            if len(dollar_players) < 5:
-                logger.error(f"Not enough players for dollar value {dollar_value}")
-                raise ValueError(f"Not enough players for dollar value {dollar_value}")
-            
-            # Randomly select 5 players
-            selected_players = dollar_players.sample(n=5, random_state=current_time.date().toordinal())
-            
-            # Add to pool
-            for _, player in selected_players.iterrows():
-                pool.append(player.to_dict())
+        # Generate new pool from the in-memory player data
+        pool = select_pool(player_table.df, current_time.date())
         
         # Save the new pool
         pool_data = {
@@ -0,0 +1,66 @@
+from flask import Blueprint, request, jsonify
+import logging
+import os
+from daily_stats import DailyStats
+from game_dates import game_date
+from sketches import PopularitySketches
+from player_table import player_table
+from routes.players import pool_for_date
+from routes.submissions import leaderboard_index, prediction_cache, submission_store
+
+stats_bp = Blueprint('stats', __name__)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-date pick counts and roster popularity, fed by every indexed submission
+daily_stats = DailyStats()
+leaderboard_index.add_listener(daily_stats.add, daily_stats.evict)
+
+# Count-Min / HyperLogLog popularity sketches, one file per closed day
+POPULARITY_SKETCH_DIR = os.environ.get('POPULARITY_SKETCH_DIR', 'sketches')
+popularity_sketches = PopularitySketches(POPULARITY_SKETCH_DIR)
+leaderboard_index.add_listener(popularity_sketches.add)
+popularity_sketches.backfill(submission_store)
+
+@stats_bp.route('/api/stats/daily', methods=['GET'])
+def get_daily_stats():
+    try:
+        date = request.args.get('date', game_date())
+        try:
+            pool = pool_for_date(date)
+        except ValueError:
+            return jsonify({'error': f'Invalid date: {date}'}), 400
+        
+        # Past dates on a partitioned store are loaded into the stats on first use
+        leaderboard_index.get(date)
+        return jsonify(daily_stats.summary(date, pool)), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_daily_stats: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@stats_bp.route('/api/stats/popularity', methods=['GET'])
+def get_popularity():
+    try:
+        limit = request.args.get('limit', 10, type=int)
+        summary = popularity_sketches.summary(list(player_table.by_id), limit=limit)
+        for window in summary.values():
+            for player in window['most_drafted']:
+                player['name'] = player_table.by_id[player['player_id']].get('Full Name')
+        return jsonify(summary), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_popularity: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@stats_bp.route('/api/stats/prediction-cache', methods=['GET'])
+def get_prediction_cache_stats():
+    try:
+        # Counters are per worker process
+        return jsonify(prediction_cache.stats()), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_prediction_cache_stats: {str(e)}")
+        return jsonify({'error': str(e)}), 500
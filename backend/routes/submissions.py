@@ -1,11 +1,22 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime
-import pandas as pd
+from flask import Blueprint, request, jsonify, make_response
 import numpy as np
 import logging
 import joblib
 import os
-import json
+import hashlib
+from submission_store import MAX_NICKNAME_LENGTH, create_submission_store, make_record
+from game_dates import game_date, is_closed_date
+from player_table import player_table
+from routes.players import pool_for_date, pool_index
+from leaderboard_index import LeaderboardIndex
+from submission_writer import GroupCommitWriter
+from submission_keys import SubmissionKeyIndex
+from roster_similarity import DEFAULT_SIMILAR_LIMIT, RosterSimilarityIndex
+from roster_space import BUDGET, ROSTER_SIZE, RosterDistributions, team_stats_dict
+from roster_optimizer import optimal_roster
+from win_model import WinContributions, WinPredictor
+from prediction_cache import PredictionCache
+from prediction_batcher import MicroBatchPredictor
 
 submissions_bp = Blueprint('submissions', __name__)
 
@@ -13,121 +24,233 @@ submissions_bp = Blueprint('submissions', __name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_FILE = 'best_model.joblib'
+SCALER_FILE = 'scaler.joblib'
+
 # Load the model and scaler
 try:
-    model = joblib.load('best_model.joblib')
-    scaler = joblib.load('scaler.joblib')
-    logger.info("Successfully loaded model and scaler")
+    model = joblib.load(MODEL_FILE)
+    scaler = joblib.load(SCALER_FILE)
+    # Identifies the exact model and scaler a prediction came from
+    model_hash = hashlib.sha1()
+    for path in (MODEL_FILE, SCALER_FILE):
+        with open(path, 'rb') as f:
+            model_hash.update(f.read())
+    model_version = model_hash.hexdigest()[:12]
+    logger.info(f"Successfully loaded model and scaler (version {model_version})")
 except Exception as e:
     logger.error(f"Error loading model or scaler: {str(e)}")
     raise
 
-# File to store submissions
+# Scaler and linear coefficients folded into one weight vector where possible
+win_predictor = WinPredictor(model, scaler)
+
+# Each player's share of predicted wins, precomputed when the model is linear
+win_contributions = None
+if win_predictor.folded:
+    win_contributions = WinContributions(
+        win_predictor,
+        player_table.df['Player ID'],
+        player_table.stats
+    )
+
+def clamp_wins(raw_wins):
+    """Keep raw predicted wins within a possible season record (0-74)"""
+    return np.clip(raw_wins, 0, 74)
+
+# Legacy storage format, imported once into an empty store
 SUBMISSIONS_FILE = 'submissions.csv'
 
-def ensure_submissions_file():
-    """Ensure the submissions file exists with the correct columns"""
-    if not os.path.exists(SUBMISSIONS_FILE):
-        df = pd.DataFrame(columns=[
-            'submission_date', 'nickname', 'players', 'results',
-            'predicted_wins', 'team_stats'
-        ])
-        df.to_csv(SUBMISSIONS_FILE, index=False)
-        logger.info("Created new submissions file")
-
-def load_submissions():
-    """Load submissions from CSV file"""
+# Store selected by SUBMISSION_STORE (postgres, sqlite or jsonl)
+submission_store = create_submission_store()
+submission_store.import_legacy_csv(SUBMISSIONS_FILE)
+
+# Per-date sorted leaderboards, built once from the store
+leaderboard_index = LeaderboardIndex(submission_store)
+
+# Each date's roster masks as one NumPy array for similarity searches
+roster_similarity = RosterSimilarityIndex()
+leaderboard_index.add_listener(roster_similarity.add, roster_similarity.evict)
+
+# O(1) one-submission-per-day check for this worker's submits
+submission_keys = SubmissionKeyIndex(leaderboard_index.keys())
+
+# Batches concurrent submits into one commit every few milliseconds
+submission_writer = GroupCommitWriter(
+    submission_store,
+    submission_keys,
+    max_batch=int(os.environ.get('SUBMIT_BATCH_SIZE', 256)),
+    max_delay=float(os.environ.get('SUBMIT_BATCH_DELAY_MS', 2)) / 1000
+)
+
+# Predicted wins of every valid roster in each day's pool, for "beats X%"
+ROSTER_DISTRIBUTION_DIR = os.environ.get('ROSTER_DISTRIBUTION_DIR', 'roster_distributions')
+roster_distributions = RosterDistributions(
+    win_predictor.predict,
+    pool_for_date,
+    player_table.stats_of,
+    ROSTER_DISTRIBUTION_DIR,
+    f"{model_version}.{player_table.version}"
+)
+roster_distributions.start_daily_job()
+
+# Concurrent single-roster predictions share one model call. A folded linear
+# model is a single dot product, so it is called directly instead.
+prediction_batcher = None
+if not win_predictor.folded:
+    prediction_batcher = MicroBatchPredictor(
+        win_predictor.predict,
+        max_batch=int(os.environ.get('PREDICT_BATCH_SIZE', 256)),
+        max_delay=float(os.environ.get('PREDICT_BATCH_DELAY_MS', 2)) / 1000
+    )
+
+def predict_one(features):
+    """Raw predicted wins of one (1, 9) team feature row"""
+    if prediction_batcher is None:
+        return float(win_predictor.predict(features)[0])
+    return float(prediction_batcher.predict_one(features))
+
+# Recently scored rosters, shared by /api/predict and /api/submit-team
+prediction_cache = PredictionCache(int(os.environ.get('PREDICTION_CACHE_SIZE', 65536)))
+
+def score_roster(player_ids):
+    """Raw predicted wins of one roster, uncached"""
+    if win_contributions is not None and len(player_ids) == win_contributions.roster_size:
+        # Linear model: the baseline plus five precomputed player contributions
+        return win_contributions.predict(player_ids)
+    return predict_one(player_table.team_features(player_ids))
+
+def predict_roster(player_ids):
+    """Raw predicted wins of one roster of known player IDs, cached by canonical roster"""
+    # The version changes whenever the model or the player data does
+    return prediction_cache.get_or_compute(
+        f"{model_version}.{player_table.version}",
+        player_ids,
+        score_roster
+    )
+
+# Most rosters scored by one /api/predict/batch request
+MAX_BATCH_ROSTERS = int(os.environ.get('MAX_BATCH_ROSTERS', 10_000))
+
+def beats_percent(submission_date, raw_wins):
+    """Share of the date's possible rosters a raw prediction beats (ties count half).
+
+    None while the date's distribution is still being scored or if it fails,
+    so the percentile never fails the request it decorates.
+    """
     try:
-        if not os.path.exists(SUBMISSIONS_FILE):
-            ensure_submissions_file()
-        df = pd.read_csv(SUBMISSIONS_FILE)
-        # Convert string representations back to Python objects
-        df['players'] = df['players'].apply(eval)
-        df['results'] = df['results'].apply(eval)
-        df['team_stats'] = df['team_stats'].apply(eval)
-        return df
+        distribution = roster_distributions.get(submission_date)
+        return None if distribution is None else distribution.beats(raw_wins)
     except Exception as e:
-        logger.error(f"Error loading submissions: {str(e)}")
-        raise
+        logger.error(f"Error computing beats_percent for {submission_date}: {str(e)}")
+        return None
 
-def save_submission(submission_date, nickname, players, results, predicted_wins, team_stats):
-    """Save a new submission to the CSV file"""
+def save_submission(submission_date, nickname, player_ids, results, predicted_wins, team_stats):
+    """Add a new submission to the submission store"""
     try:
-        df = load_submissions()
-        
-        # Check if user already submitted today
-        if len(df[(df['submission_date'] == submission_date) & (df['nickname'] == nickname)]) > 0:
-            raise ValueError("You have already submitted a team today")
-        
-        # Add new submission
-        new_row = pd.DataFrame([{
-            'submission_date': submission_date,
-            'nickname': nickname,
-            'players': str(players),  # Convert to string for CSV storage
-            'results': str(results),
-            'predicted_wins': predicted_wins,
-            'team_stats': str(team_stats)
-        }])
-        
-        df = pd.concat([df, new_row], ignore_index=True)
-        df.to_csv(SUBMISSIONS_FILE, index=False)
+        # Pool-relative bitmask; None if the roster isn't drawn from that day's pool
+        roster_mask = pool_index(submission_date).mask(player_ids)
+        record = make_record(submission_date, nickname, player_ids, player_table.version,
+                             results, predicted_wins, team_stats, roster_mask=roster_mask)
+        submission_writer.submit(record)
+        leaderboard_index.add(record)
         logger.info(f"Saved submission for {nickname} on {submission_date}")
         
     except Exception as e:
         logger.error(f"Error saving submission: {str(e)}")
         raise
 
+# Error for a request body or roster that can't be read as player IDs
+INVALID_BODY_ERROR = 'Request body must be a JSON object'
+INVALID_PLAYERS_ERROR = 'players must be a list of player IDs or player objects with a Player ID'
+# Range of the int64 arrays player IDs are looked up and scored in
+INT64_MIN, INT64_MAX = int(np.iinfo(np.int64).min), int(np.iinfo(np.int64).max)
+
+def parse_player_id(value):
+    """Return a player ID sent as a JSON integer, or None for anything that isn't one"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    # bool is an int subclass; IDs must also fit the int64 arrays they are scored in
+    if isinstance(value, bool) or not isinstance(value, int) or not INT64_MIN <= value <= INT64_MAX:
+        return None
+    return value
+
+def parse_player_ids(players):
+    """Return the player IDs of a roster sent as IDs or player dicts, or None if malformed"""
+    if not isinstance(players, list):
+        return None
+    player_ids = []
+    for player in players:
+        if isinstance(player, dict):
+            player = player['Player ID'] if 'Player ID' in player else player.get('id')
+        player_id = parse_player_id(player)
+        if player_id is None:
+            return None
+        player_ids.append(player_id)
+    return player_ids
+
+def roster_rule_error(submission_date, player_ids):
+    """Why a roster of known player IDs breaks the date's game rules, or None if it is legal"""
+    if len(player_ids) != ROSTER_SIZE:
+        return f'Select exactly {ROSTER_SIZE} players'
+    if len(set(player_ids)) != len(player_ids):
+        return 'Each player can only be selected once'
+    if pool_index(submission_date).mask(player_ids) is None:
+        return f'Every player must be from the {submission_date} pool'
+    total_cost = sum(int(player_table.by_id[player_id]['Dollar Value']) for player_id in player_ids)
+    if total_cost > BUDGET:
+        return f'Roster costs ${total_cost}, over the ${BUDGET} budget'
+    return None
+
 @submissions_bp.route('/api/submit-team', methods=['POST'])
 def submit_team():
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': INVALID_BODY_ERROR}), 400
         
         # Validate required fields
         required_fields = ['nickname', 'players', 'results']
         for field in required_fields:
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
+        if not isinstance(data['nickname'], str) or not data['nickname']:
+            return jsonify({'error': 'nickname must be a non-empty string'}), 400
+        if len(data['nickname']) > MAX_NICKNAME_LENGTH:
+            return jsonify({'error': f'nickname must be at most {MAX_NICKNAME_LENGTH} characters'}), 400
+        
+        # Rosters are stored as player IDs, so every player must be known
+        player_ids = parse_player_ids(data['players'])
+        if player_ids is None:
+            return jsonify({'error': INVALID_PLAYERS_ERROR}), 400
+        if not player_ids:
+            return jsonify({'error': 'No players selected'}), 400
+        unknown_ids = [player_id for player_id in player_ids if player_id not in player_table]
+        if unknown_ids:
+            return jsonify({'error': f'Unknown player IDs: {unknown_ids}'}), 400
         
         # Get current date in Eastern time
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        
-        # Calculate team statistics from the 5 selected players
-        team_stats = {
-            'points': sum(float(p['Points Per Game (Avg)']) for p in data['players']),
-            'rebounds': sum(float(p['Rebounds Per Game (Avg)']) for p in data['players']),
-            'assists': sum(float(p['Assists Per Game (Avg)']) for p in data['players']),
-            'steals': sum(float(p['Steals Per Game (Avg)']) for p in data['players']),
-            'blocks': sum(float(p['Blocks Per Game (Avg)']) for p in data['players']),
-            'turnovers': sum(float(p['TOV']) for p in data['players']),
-            'fg_pct': sum(float(p['Field Goal % (Avg)']) for p in data['players']) / len(data['players']),
-            'ft_pct': sum(float(p['Free Throw % (Avg)']) for p in data['players']) / len(data['players']),
-            'three_pct': sum(float(p['Three Point % (Avg)']) for p in data['players']) / len(data['players'])
-        }
+        current_date = game_date()
         
-        # Scale the features
-        features = np.array([[
-            team_stats['points'],
-            team_stats['rebounds'],
-            team_stats['assists'],
-            team_stats['steals'],
-            team_stats['blocks'],
-            team_stats['turnovers'],
-            team_stats['fg_pct'],
-            team_stats['ft_pct'],
-            team_stats['three_pct']
-        ]])
-        
-        scaled_features = scaler.transform(features)
-        
-        # Make prediction
-        predicted_wins = model.predict(scaled_features)[0]
-        predicted_wins = max(0, min(74, predicted_wins))  # Keep range at 0-74
+        # Five distinct players from today's pool, within the budget
+        rule_error = roster_rule_error(current_date, player_ids)
+        if rule_error:
+            return jsonify({'error': rule_error}), 400
+        
+        # Team features come from the server's player data, never the client's stats
+        team_stats = team_stats_dict(player_table.team_features(player_ids)[0])
+        
+        # Make prediction (0-74)
+        raw_wins = predict_roster(player_ids)
+        predicted_wins = float(clamp_wins(raw_wins))
+        # Before saving, so nothing after the commit can turn it into an error
+        beats = beats_percent(current_date, raw_wins)
         
         # Save the submission
         save_submission(
             current_date,
             data['nickname'],
-            data['players'],
+            player_ids,
             data['results'],
             predicted_wins,
             team_stats
@@ -135,7 +258,8 @@ def submit_team():
         
         return jsonify({
             'message': 'Team submitted successfully',
-            'predicted_wins': predicted_wins
+            'predicted_wins': predicted_wins,
+            'beats_percent': beats
         }), 201
             
     except ValueError as e:
@@ -146,86 +270,335 @@ def submit_team():
         logger.error(f"Error in submit_team: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+# Page size used for around=<nickname> when no limit is given
+DEFAULT_AROUND_LIMIT = 10
+
+# Closed days' submissions never change, but their bodies are rendered from the
+# current player data, so shared caches keep them and revalidate with the ETag
+# (which carries player_table.version) rather than treating them as immutable
+PAST_LEADERBOARD_CACHE_CONTROL = 'public, no-cache'
+# Open days' leaderboards must be revalidated with their ETag on every poll
+CURRENT_LEADERBOARD_CACHE_CONTROL = 'no-cache'
+
+def leaderboard_etag(date, board):
+    """Strong ETag for a date's leaderboard: its size and a hash of its submissions"""
+    return f"{date}.{board.version}.{board.digest:016x}.{player_table.version}"
+
+def set_leaderboard_caching(response, date, etag):
+    response.set_etag(etag)
+    if is_closed_date(date):
+        response.headers['Cache-Control'] = PAST_LEADERBOARD_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = CURRENT_LEADERBOARD_CACHE_CONTROL
+    return response
+
+def leaderboard_entry(rank, record):
+    """Build the response entry for one ranked submission"""
+    return {
+        'rank': rank + 1,
+        'nickname': record['nickname'],
+        'players': player_table.lookup(record['player_ids']),
+        'results': record['results'],
+        'predicted_wins': record['predicted_wins'],
+        'team_stats': record['team_stats']
+    }
+
+def compact_leaderboard(records):
+    """Build the columnar leaderboard body with one shared player dictionary"""
+    roster_ids = [record['player_ids'] for record in records]
+    pool_ids = {player_id for roster in roster_ids for player_id in roster}
+    return {
+        'players': {str(player['Player ID']): player for player in player_table.lookup(sorted(pool_ids))},
+        'nicknames': [record['nickname'] for record in records],
+        'wins': [record['predicted_wins'] for record in records],
+        'roster_ids': roster_ids
+    }
+
 @submissions_bp.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
     try:
         # Get date from query parameter or use current date
-        date = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
+        date = request.args.get('date', game_date())
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
+        around = request.args.get('around')
+        response_format = request.args.get('format', 'full')
         logger.info(f"Fetching leaderboard for date: {date}")
         
-        # Load submissions
-        df = load_submissions()
+        if (limit is not None and limit < 0) or offset < 0:
+            return jsonify({'error': 'limit and offset must be non-negative'}), 400
+        if response_format not in ('full', 'compact'):
+            return jsonify({'error': f'Unknown format: {response_format}'}), 400
         
-        # Filter for the requested date and sort by predicted wins
-        daily_submissions = df[df['submission_date'] == date].sort_values('predicted_wins', ascending=False)
+        board = leaderboard_index.get(date)
         
-        # Convert to list of dictionaries
-        submissions = []
-        for _, row in daily_submissions.iterrows():
-            submissions.append({
-                'nickname': row['nickname'],
-                'players': row['players'],
-                'results': row['results'],
-                'predicted_wins': row['predicted_wins'],
-                'team_stats': row['team_stats']
-            })
+        # Answer conditional polls from the in-memory version alone
+        etag = leaderboard_etag(date, board)
+        if request.if_none_match.contains(etag):
+            return set_leaderboard_caching(make_response('', 304), date, etag)
         
-        logger.info(f"Found {len(submissions)} submissions for date {date}")
+        # Center the page on a nickname's rank
+        if around is not None:
+            rank = board.rank(around)
+            if rank is None:
+                return jsonify({'error': f'No submission from {around} on {date}'}), 404
+            if limit is None:
+                limit = DEFAULT_AROUND_LIMIT
+            offset = max(0, min(rank - limit // 2, len(board) - limit))
+        
+        stop = offset + limit if limit is not None else None
+        records = board.ranked(offset, stop)
+        logger.info(f"Returning {len(records)} of {len(board)} submissions for date {date}")
+        
+        body = {
+            'date': date,
+            'total': len(board),
+            'offset': offset
+        }
+        if response_format == 'compact':
+            # Entries are ranked offset + 1, offset + 2, ... in array order
+            body['format'] = 'compact'
+            body.update(compact_leaderboard(records))
+        else:
+            body['submissions'] = [leaderboard_entry(offset + i, record) for i, record in enumerate(records)]
+        return set_leaderboard_caching(make_response(jsonify(body), 200), date, etag)
+        
+    except Exception as e:
+        logger.error(f"Error in get_leaderboard: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@submissions_bp.route('/api/leaderboard/rank', methods=['GET'])
+def get_leaderboard_rank():
+    try:
+        date = request.args.get('date', game_date())
+        nickname = request.args.get('nickname')
+        if not nickname:
+            return jsonify({'error': 'Missing required parameter: nickname'}), 400
+        
+        board = leaderboard_index.get(date)
+        rank = board.rank(nickname)
+        if rank is None:
+            return jsonify({'error': f'No submission from {nickname} on {date}'}), 404
+        
+        total = len(board)
         return jsonify({
             'date': date,
-            'submissions': submissions
+            'nickname': nickname,
+            'rank': rank + 1,
+            'total': total,
+            # Share of the board this submission ranks ahead of or level with
+            'percentile': round(100.0 * (total - rank) / total, 2),
+            'predicted_wins': board.records[nickname]['predicted_wins']
         }), 200
         
     except Exception as e:
-        logger.error(f"Error in get_leaderboard: {str(e)}")
+        logger.error(f"Error in get_leaderboard_rank: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@submissions_bp.route('/api/predict', methods=['POST', 'OPTIONS'])
-def predict():
+@submissions_bp.route('/api/leaderboard/similar', methods=['GET'])
+def get_similar_rosters():
+    try:
+        date = request.args.get('date', game_date())
+        nickname = request.args.get('nickname')
+        limit = request.args.get('limit', DEFAULT_SIMILAR_LIMIT, type=int)
+        if not nickname:
+            return jsonify({'error': 'Missing required parameter: nickname'}), 400
+        if limit < 0:
+            return jsonify({'error': 'limit must be non-negative'}), 400
+        
+        # Loading the board also indexes its roster masks
+        board = leaderboard_index.get(date)
+        if board.rank(nickname) is None:
+            return jsonify({'error': f'No submission from {nickname} on {date}'}), 404
+        
+        matches = roster_similarity.similar(date, nickname, limit)
+        if matches is None:
+            return jsonify({'error': f"{nickname}'s roster is not from the {date} pool"}), 404
+        
+        similar = []
+        for other, similarity, shared in matches:
+            entry = leaderboard_entry(board.rank(other), board.records[other])
+            entry['similarity'] = round(similarity, 4)
+            entry['shared_players'] = shared
+            similar.append(entry)
+        
+        return jsonify({
+            'date': date,
+            'nickname': nickname,
+            'total': len(board),
+            'similar': similar
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error in get_similar_rosters: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@submissions_bp.route('/api/predict/batch', methods=['POST', 'OPTIONS'])
+def predict_batch():
     if request.method == 'OPTIONS':
         return '', 204
     try:
-        data = request.json
-        selected_players = data.get('players', [])
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': INVALID_BODY_ERROR}), 400
+        rosters = data.get('rosters', [])
         
-        if not selected_players:
-            return jsonify({'error': 'No players selected'}), 400
+        if not isinstance(rosters, list):
+            return jsonify({'error': 'rosters must be a list of rosters'}), 400
+        if not rosters:
+            return jsonify({'error': 'No rosters given'}), 400
+        if len(rosters) > MAX_BATCH_ROSTERS:
+            return jsonify({'error': f'At most {MAX_BATCH_ROSTERS} rosters per batch'}), 400
+        array = None
+        # Lists of plain integers (not bools or floats) convert straight to an (N, roster size) array
+        if all(isinstance(roster, list) and all(type(player_id) is int for player_id in roster)
+               for roster in rosters):
+            try:
+                array = np.array(rosters, dtype=np.int64)
+            except (OverflowError, ValueError):
+                # IDs past int64, or rosters of different sizes
+                array = None
+        if array is not None:
+            rosters = array
+        else:
+            # Rosters of player dicts, of different sizes, or with IDs that
+            # aren't int64 integers are checked one by one
+            rosters = [parse_player_ids(roster) for roster in rosters]
+            if any(roster is None for roster in rosters):
+                return jsonify({'error': 'Every roster must be a list of player IDs or player objects '
+                                         'with a Player ID'}), 400
+            if any(len(roster) != len(rosters[0]) for roster in rosters):
+                return jsonify({'error': 'Every roster must have the same number of players'}), 400
+            rosters = np.array(rosters, dtype=np.int64)
+        if rosters.ndim != 2 or rosters.shape[1] == 0:
+            return jsonify({'error': 'Every roster must be a non-empty list of players'}), 400
+        unknown = player_table.rows_of(rosters) < 0
+        if unknown.any():
+            return jsonify({'error': f'Unknown player IDs: {sorted(set(rosters[unknown].tolist()))}'}), 400
         
-        # Calculate team statistics
-        team_stats = {
-            'points': sum(float(p['Points Per Game (Avg)']) for p in selected_players),
-            'rebounds': sum(float(p['Rebounds Per Game (Avg)']) for p in selected_players),
-            'assists': sum(float(p['Assists Per Game (Avg)']) for p in selected_players),
-            'steals': sum(float(p['Steals Per Game (Avg)']) for p in selected_players),
-            'blocks': sum(float(p['Blocks Per Game (Avg)']) for p in selected_players),
-            'turnovers': sum(float(p['TOV']) for p in selected_players),
-            'fg_pct': sum(float(p['Field Goal % (Avg)']) for p in selected_players) / len(selected_players),
-            'ft_pct': sum(float(p['Free Throw % (Avg)']) for p in selected_players) / len(selected_players),
-            'three_pct': sum(float(p['Three Point % (Avg)']) for p in selected_players) / len(selected_players)
-        }
+        # One (N, 9) feature build and one model call for the whole batch
+        raw_wins = win_predictor.predict(player_table.roster_features(rosters))
+        distribution = roster_distributions.get(game_date())
+        return jsonify({
+            'predicted_wins': clamp_wins(raw_wins).tolist(),
+            # None per roster until today's distribution has been scored
+            'beats_percent': [None] * len(raw_wins) if distribution is None else distribution.beats_many(raw_wins)
+        }), 200
         
-        # Scale the features
-        features = np.array([[
-            team_stats['points'],  # Let the scaler handle the scaling
-            team_stats['rebounds'],
-            team_stats['assists'],
-            team_stats['steals'],
-            team_stats['blocks'],
-            team_stats['turnovers'],
-            team_stats['fg_pct'],
-            team_stats['ft_pct'],
-            team_stats['three_pct']
-        ]])
+    except Exception as e:
+        logger.error(f"Error in predict_batch: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@submissions_bp.route('/api/optimal-roster', methods=['GET'])
+def get_optimal_roster():
+    try:
+        date = request.args.get('date', game_date())
+        budget = request.args.get('budget', BUDGET, type=int)
+        roster_size = request.args.get('roster_size', ROSTER_SIZE, type=int)
+        if budget < 0 or roster_size <= 0:
+            return jsonify({'error': 'budget must be non-negative and roster_size positive'}), 400
+        try:
+            pool = pool_for_date(date)
+        except ValueError:
+            return jsonify({'error': f'Invalid date: {date}'}), 400
         
-        scaled_features = scaler.transform(features)
+        if roster_size > len(pool):
+            return jsonify({'error': f'roster_size must be at most the {len(pool)}-player pool'}), 400
         
-        # Make prediction
-        predicted_wins = model.predict(scaled_features)[0]
+        costs = [int(player['Dollar Value']) for player in pool]
+        try:
+            roster, wins, method, exact = optimal_roster(
+                win_predictor, player_table.stats_of([int(player['Player ID']) for player in pool]),
+                costs, budget, roster_size)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if roster is None:
+            return jsonify({'error': f'No {roster_size}-player roster fits a ${budget} budget'}), 404
         
-        # Ensure prediction stays within reasonable bounds
-        predicted_wins = max(0, min(74, predicted_wins))
+        return jsonify({
+            'date': date,
+            'budget': budget,
+            'roster_size': roster_size,
+            'players': [pool[i] for i in roster],
+            'total_cost': sum(costs[i] for i in roster),
+            'predicted_wins': max(0, min(74, wins)),
+            'method': method,
+            # False when a non-linear model's roster space was too large to score exhaustively
+            'exact': exact
+        }), 200
         
-        return jsonify({'predicted_wins': predicted_wins})
+    except Exception as e:
+        logger.error(f"Error in get_optimal_roster: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@submissions_bp.route('/api/explain', methods=['POST', 'OPTIONS'])
+def explain():
+    if request.method == 'OPTIONS':
+        return '', 204
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': INVALID_BODY_ERROR}), 400
+        player_ids = parse_player_ids(data.get('players', []))
+        if player_ids is None:
+            return jsonify({'error': INVALID_PLAYERS_ERROR}), 400
+        
+        if win_contributions is None:
+            return jsonify({'error': 'Explanations need a linear model'}), 501
+        if len(player_ids) != win_contributions.roster_size:
+            return jsonify({'error': f'Select exactly {win_contributions.roster_size} players'}), 400
+        unknown_ids = [player_id for player_id in player_ids if player_id not in win_contributions]
+        if unknown_ids:
+            return jsonify({'error': f'Unknown player IDs: {unknown_ids}'}), 400
+        
+        contributions = win_contributions.explain(player_ids)
+        predicted_wins = win_contributions.bias + float(contributions.sum())
+        return jsonify({
+            # Predicted wins are the baseline plus every player's contribution, before clamping
+            'baseline': win_contributions.bias,
+            'players': [{
+                'player_id': player['Player ID'],
+                'name': player['Full Name'],
+                'dollar_value': player['Dollar Value'],
+                'contribution': float(contribution)
+            } for player, contribution in zip(player_table.lookup(player_ids), contributions)],
+            'predicted_wins': max(0, min(74, predicted_wins))
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error in explain: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@submissions_bp.route('/api/predict', methods=['POST', 'OPTIONS'])
+def predict():
+    if request.method == 'OPTIONS':
+        return '', 204
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': INVALID_BODY_ERROR}), 400
+        # Players may be sent as IDs or as the dicts /api/players returns
+        player_ids = parse_player_ids(data.get('players', []))
+        if player_ids is None:
+            return jsonify({'error': INVALID_PLAYERS_ERROR}), 400
+        
+        if not player_ids:
+            return jsonify({'error': 'No players selected'}), 400
+        unknown_ids = [player_id for player_id in player_ids if player_id not in player_table]
+        if unknown_ids:
+            return jsonify({'error': f'Unknown player IDs: {unknown_ids}'}), 400
+        current_date = game_date()
+        rule_error = roster_rule_error(current_date, player_ids)
+        if rule_error:
+            return jsonify({'error': rule_error}), 400
+        
+        # Make prediction (0-74)
+        raw_wins = predict_roster(player_ids)
+        
+        return jsonify({
+            'predicted_wins': float(clamp_wins(raw_wins)),
+            'beats_percent': beats_percent(current_date, raw_wins)
+        })
     except Exception as e:
         logger.error(f"Error in predict: {str(e)}")
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
@@ -0,0 +1,224 @@
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+from datetime import timedelta
+
+import numpy as np
+
+from game_dates import game_today
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _hash_pair(value):
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+
+class CountMinSketch:
+    """Approximate counter with fixed memory; estimates never undercount"""
+
+    def __init__(self, width=2048, depth=4, counts=None):
+        self.width = width
+        self.depth = depth
+        self.counts = counts if counts is not None else np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, key):
+        h1, h2 = _hash_pair(key)
+        h2 |= 1
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, count=1):
+        self.counts[np.arange(self.depth), self._columns(key)] += count
+
+    def estimate(self, key):
+        return int(self.counts[np.arange(self.depth), self._columns(key)].min())
+
+    def merge(self, other):
+        self.counts += other.counts
+        return self
+
+
+class HyperLogLog:
+    """Distinct-count estimator using 2**precision one-byte registers"""
+
+    def __init__(self, precision=14, registers=None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, value):
+        h, _ = _hash_pair(value)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+
+class DaySketch:
+    """Player pick counts and distinct nicknames for one date"""
+
+    def __init__(self, cms=None, hll=None, submissions=0):
+        self.cms = cms or CountMinSketch()
+        self.hll = hll or HyperLogLog()
+        self.submissions = submissions
+
+    def add(self, record):
+        self.submissions += 1
+        self.hll.add(record['nickname'])
+        for player_id in record['player_ids']:
+            self.cms.add(player_id)
+
+    def merge(self, other):
+        self.cms.merge(other.cms)
+        self.hll.merge(other.hll)
+        self.submissions += other.submissions
+        return self
+
+    def copy(self):
+        return DaySketch().merge(self)
+
+    def save(self, path):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, cms=self.cms.counts, hll=self.hll.registers, submissions=np.int64(self.submissions))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            cms = CountMinSketch(counts=data['cms'].copy())
+            hll = HyperLogLog(registers=data['hll'].copy())
+            return cls(cms, hll, int(data['submissions']))
+
+
+class PopularitySketches:
+    """All-time and rolling-window player popularity in bounded memory.
+
+    Open days (today and yesterday) are sketched in memory from indexed
+    submissions. Once a day closes its sketch is saved as
+    `<directory>/<date>.npz` and folded into the all-time sketch; only the
+    last `window_days` closed sketches are kept for the rolling window.
+    Sketches merge by addition (Count-Min) and register max (HyperLogLog),
+    so every worker builds identical day files from the same submissions.
+    """
+
+    DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}\.npz$')
+
+    def __init__(self, directory, window_days=30, open_days=1):
+        self.directory = directory
+        self.window_days = window_days
+        self.open_days = open_days
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._open = {}
+        self._recent = {}
+        self._closed_dates = set()
+        self._all_time = DaySketch()
+        for name in sorted(os.listdir(directory)):
+            if self.DATE_PATTERN.match(name):
+                self._fold(name[:-len('.npz')], DaySketch.load(os.path.join(directory, name)))
+        logger.info(f"Loaded popularity sketches for {len(self._closed_dates)} closed days")
+
+    def _first_open_date(self):
+        return (game_today() - timedelta(days=self.open_days)).isoformat()
+
+    def _window_start(self):
+        return (game_today() - timedelta(days=self.window_days - 1)).isoformat()
+
+    def _fold(self, submission_date, sketch):
+        """Add a closed day's sketch to the all-time totals"""
+        self._closed_dates.add(submission_date)
+        self._all_time.merge(sketch)
+        if submission_date >= self._window_start():
+            self._recent[submission_date] = sketch
+
+    def _close_days(self, before=None):
+        """Persist and fold open-day sketches whose date has closed (and is before `before`)"""
+        first_open = self._first_open_date()
+        if before is not None:
+            first_open = min(first_open, before)
+        for submission_date in [d for d in self._open if d < first_open]:
+            sketch = self._open.pop(submission_date)
+            sketch.save(os.path.join(self.directory, f'{submission_date}.npz'))
+            self._fold(submission_date, sketch)
+        window_start = self._window_start()
+        for submission_date in [d for d in self._recent if d < window_start]:
+            del self._recent[submission_date]
+
+    def has_day(self, submission_date):
+        with self._lock:
+            return submission_date in self._closed_dates
+
+    def add(self, record):
+        """Count an indexed submission; days already persisted are skipped"""
+        submission_date = record['submission_date']
+        with self._lock:
+            if submission_date in self._closed_dates:
+                return
+            sketch = self._open.get(submission_date)
+            if sketch is None:
+                # Submissions arrive grouped by day, so earlier closed days are
+                # complete once a later day starts; close them to bound memory
+                self._close_days(before=submission_date)
+                sketch = self._open[submission_date] = DaySketch()
+            sketch.add(record)
+
+    def backfill(self, store):
+        """Sketch closed days that a date-partitioned store never replays"""
+        if not store.date_partitioned:
+            return
+        first_open = self._first_open_date()
+        for submission_date in store.dates():
+            if submission_date < first_open and not self.has_day(submission_date):
+                for record in store.read_date(submission_date):
+                    self.add(record)
+        with self._lock:
+            self._close_days()
+
+    def summary(self, player_ids, limit=10):
+        """Return submissions, unique users and most drafted players, all time and in the window"""
+        with self._lock:
+            self._close_days()
+            all_time = self._all_time.copy()
+            window = DaySketch()
+            window_start = self._window_start()
+            for sketch in self._recent.values():
+                window.merge(sketch)
+            for submission_date, sketch in self._open.items():
+                all_time.merge(sketch)
+                if submission_date >= window_start:
+                    window.merge(sketch)
+
+        def describe(sketch):
+            picks = sorted(((sketch.cms.estimate(player_id), player_id) for player_id in player_ids), reverse=True)
+            return {
+                'submissions': sketch.submissions,
+                'unique_users': sketch.hll.count(),
+                'most_drafted': [{'player_id': player_id, 'picks': count}
+                                 for count, player_id in picks[:limit] if count > 0]
+            }
+
+        return {
+            'all_time': describe(all_time),
+            f'last_{self.window_days}_days': describe(window)
+        }
@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Worker process counts to measure
+WORKER_COUNTS = [1, 2, 4, 8]
+# Submits made by each worker
+SUBMITS_PER_WORKER = 200
+# Nicknames every worker tries to submit, so exactly one of each must win
+SHARED_NICKNAMES = 50
+# With a CPU per worker, N workers must reach at least this multiple of the
+# single-worker rate. Rounds with more workers than CPUs only time-slice one
+# another (on a 1-CPU host the rate falls from ~500 to ~120 requests/s at 8
+# workers), so their throughput is reported but not checked.
+MIN_SCALING = 1.0
+
+
+def configure_store(store, workdir):
+    """Point the app at a fresh store of the requested kind inside workdir"""
+    os.environ['SUBMISSION_STORE'] = store
+    os.environ['SUBMISSIONS_LOG'] = os.path.join(workdir, 'submissions.jsonl')
+    os.environ['SUBMISSIONS_DB'] = os.path.join(workdir, 'submissions.db')
+    os.environ['ROSTER_DISTRIBUTION_DIR'] = os.path.join(workdir, 'roster_distributions')
+    os.environ['POPULARITY_SKETCH_DIR'] = os.path.join(workdir, 'sketches')
+
+
+def hammer(worker_id, start_event, results):
+    """One forked worker: import the app fresh and submit through its test client"""
+    # Imported here so every worker builds its own stores, index and writer
+    from app import app
+    client = app.test_client()
+    # The five cheapest players in today's pool: a valid roster, the same in every worker
+    pool = client.get('/api/players').get_json()
+    players = sorted(pool, key=lambda player: (player['Dollar Value'], player['Player ID']))[:5]
+    accepted = []
+    start_event.wait()
+    for i in range(SUBMITS_PER_WORKER):
+        if i < SHARED_NICKNAMES:
+            nickname = f"shared{i}"
+        else:
+            nickname = f"worker{worker_id}-{i}"
+        response = client.post('/api/submit-team', json={
+            'nickname': nickname,
+            'players': players,
+            'results': {}
+        })
+        if response.status_code == 201:
+            accepted.append(nickname)
+        elif response.status_code != 409:
+            print(f"worker {worker_id}: unexpected status {response.status_code}: {response.get_data(as_text=True)}")
+    results.put(accepted)
+
+
+def run_round(store, workers):
+    """Run one round; returns (checks passed, requests per second)"""
+    workdir = tempfile.mkdtemp(dir='.')
+    try:
+        configure_store(store, workdir)
+        # The store reader is created in the parent only after the workers finish
+        context = multiprocessing.get_context('fork')
+        start_event = context.Event()
+        results = context.Queue()
+        processes = [context.Process(target=hammer, args=(w, start_event, results))
+                     for w in range(workers)]
+        for process in processes:
+            process.start()
+        # Give every worker time to import the app before the clock starts
+        time.sleep(5)
+        start = time.perf_counter()
+        start_event.set()
+        accepted = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+
+        from submission_store import create_submission_store
+        stored = create_submission_store().read_all()
+        stored_nicknames = [record['nickname'] for record in stored]
+        accepted_nicknames = [nickname for batch in accepted for nickname in batch]
+
+        lost = set(accepted_nicknames) - set(stored_nicknames)
+        duplicates = len(stored_nicknames) - len(set(stored_nicknames))
+        shared_winners = sum(1 for nickname in accepted_nicknames if nickname.startswith('shared'))
+        ok = not lost and duplicates == 0 and shared_winners == SHARED_NICKNAMES
+        rate = workers * SUBMITS_PER_WORKER / elapsed
+        print(f"{store:>8} {workers:>8} {len(accepted_nicknames):>9} {len(stored):>7} "
+              f"{rate:>10.0f} {'ok' if ok else 'FAILED':>7}")
+        return ok, rate
+    finally:
+        shutil.rmtree(workdir)
+
+
+def run(stores):
+    cpus = os.cpu_count() or 1
+    print(f"{'store':>8} {'workers':>8} {'accepted':>9} {'stored':>7} {'requests/s':>10} {'check':>7}")
+    all_ok = True
+    for store in stores:
+        rates = {}
+        for workers in WORKER_COUNTS:
+            ok, rates[workers] = run_round(store, workers)
+            all_ok = ok and all_ok
+        for workers, rate in rates.items():
+            if workers == 1:
+                continue
+            if workers > cpus:
+                print(f"{store}: {workers} workers not checked for scaling on {cpus} CPU(s)")
+            elif rate < MIN_SCALING * rates[1]:
+                print(f"{store}: {workers} workers reached {rate:.0f} requests/s, "
+                      f"below {MIN_SCALING:g}x the single-worker {rates[1]:.0f}")
+                all_ok = False
+    return all_ok
+
+
+if __name__ == '__main__':
+    # Usage: python stress_submissions.py [jsonl] [sqlite]  (run from the deploy directory)
+    sys.exit(0 if run(sys.argv[1:] or ['jsonl', 'sqlite']) else 1)
@@ -0,0 +1,38 @@
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SubmissionKeyIndex:
+    """Hash set of (submission_date, nickname) pairs for the one-per-day check.
+
+    The set is rebuilt from the store at startup and updated on every
+    accepted write, so repeat submits from this worker are rejected in O(1)
+    without a store round trip. Other workers' submissions are not in this
+    process's set; the store's own check on write (the flock catch-up or
+    the unique index) rejects those.
+    """
+
+    def __init__(self, keys=()):
+        self._keys = set(keys)
+        self._lock = threading.Lock()
+        logger.info(f"Built submission key index with {len(self._keys)} keys")
+
+    def __len__(self):
+        return len(self._keys)
+
+    def reserve(self, key):
+        """Claim a key for a pending write; returns False if it is already taken"""
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def release(self, key):
+        """Give back a key whose write failed"""
+        with self._lock:
+            self._keys.discard(key)
@@ -0,0 +1,842 @@
+import ast
+import csv
+import fcntl
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from game_dates import OPEN_DAYS, game_date, game_today
+from rosters import roster_hash
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns of a stored submission, in export order
+SUBMISSION_FIELDS = [
+    'submission_date', 'nickname', 'player_ids', 'dataset_version', 'roster_mask', 'roster_hash',
+    'results', 'predicted_wins', 'team_stats', 'created_at'
+]
+
+# Columns that hold nested objects and are JSON-encoded in the CSV export
+JSON_FIELDS = ['player_ids', 'results', 'team_stats']
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+# Postgres migrations, in the order they must be applied
+MIGRATIONS = [
+    'create_submissions_table.sql', 'add_prediction_columns.sql', 'add_dataset_version.sql',
+    'add_roster_mask.sql'
+]
+
+DUPLICATE_SUBMISSION_ERROR = "You have already submitted a team today"
+
+# Longest nickname the submissions table holds (VARCHAR(50))
+MAX_NICKNAME_LENGTH = 50
+
+# Number of players in a submitted roster
+ROSTER_SIZE = 5
+
+
+class SubmissionStore:
+    """Interface shared by every submission storage backend.
+
+    `add` raises ValueError when the nickname already has a submission for
+    that date; the read methods return plain record dicts.
+    """
+
+    # True when past dates are stored apart and should be read one at a time
+    date_partitioned = False
+
+    def add(self, record):
+        raise NotImplementedError
+
+    def add_many(self, records):
+        """Add a batch of records; returns one error (or None) per record"""
+        errors = []
+        for record in records:
+            try:
+                self.add(record)
+                errors.append(None)
+            except ValueError as e:
+                errors.append(e)
+        return errors
+
+    def read_all(self):
+        """Return every stored record, oldest first"""
+        raise NotImplementedError
+
+    def read_date(self, submission_date):
+        """Return the records for one date, best predicted_wins first"""
+        records = [r for r in self.read_all() if r['submission_date'] == submission_date]
+        return sort_records(records)
+
+    def read_since(self, cursor):
+        """Return (records added after `cursor`, new cursor); pass None to read everything"""
+        records = self.read_all()
+        start = cursor or 0
+        return records[start:], len(records)
+
+    def read_open_since(self, cursor):
+        """Like read_since, but only for dates that can still receive submissions"""
+        return self.read_since(cursor)
+
+    def exists(self, submission_date, nickname):
+        """Return True if the nickname has a stored submission for the date"""
+        return any(r['nickname'] == nickname for r in self.read_date(submission_date))
+
+    def is_empty(self):
+        return not self.read_all()
+
+    def import_legacy_csv(self, csv_path):
+        """Seed the store from the old submissions.csv file, once.
+
+        Every row is parsed before anything is written and then added with a
+        single add_many, which the stores commit as one batch. Completion is
+        recorded in `<csv_path>.imported`; until that marker exists the import
+        reruns on startup, and rows already stored (by an interrupted run or a
+        concurrent worker) are skipped as duplicates.
+        """
+        marker_path = csv_path + '.imported'
+        if not os.path.exists(csv_path) or os.path.exists(marker_path):
+            return 0
+        records = []
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                # The old file stored Python reprs of these columns
+                player_ids = extract_player_ids(ast.literal_eval(row['players']))
+                records.append({
+                    'submission_date': row['submission_date'],
+                    'nickname': row['nickname'],
+                    'player_ids': player_ids,
+                    'dataset_version': None,
+                    'roster_mask': None,
+                    'roster_hash': roster_hash(player_ids),
+                    'results': ast.literal_eval(row['results']),
+                    'predicted_wins': float(row['predicted_wins']),
+                    'team_stats': ast.literal_eval(row['team_stats']),
+                    'created_at': row.get('created_at') or None
+                })
+        errors = self.add_many(records)
+        failed = [error for error in errors if error is not None and not isinstance(error, ValueError)]
+        if failed:
+            raise failed[0]
+        imported = errors.count(None)
+        with open(marker_path, 'w', encoding='utf-8') as f:
+            f.write(f"{len(records)}\n")
+        logger.info(f"Imported {imported} of {len(records)} submissions from {csv_path}")
+        return imported
+
+    def export_csv(self, csv_path):
+        """Write every stored submission to a CSV export"""
+        records = self.read_all()
+        tmp_path = csv_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SUBMISSION_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for record in records:
+                row = dict(record)
+                for field in JSON_FIELDS:
+                    row[field] = json.dumps(row.get(field))
+                writer.writerow(row)
+        os.replace(tmp_path, csv_path)
+        logger.info(f"Exported {len(records)} submissions to {csv_path}")
+        return len(records)
+
+
+class SubmissionLog(SubmissionStore):
+    """Append-only, line-delimited JSON log of submissions.
+
+    Each accepted submission is written as a single JSON line and fsync'd
+    before the call returns, so a submit costs one append no matter how
+    many submissions have been stored before it.
+
+    Several processes may share the log. Appends hold an exclusive flock on
+    the file and first read whatever other processes appended since this
+    one last looked, so the duplicate check always sees every submission.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._keys = set()
+        # Byte offset up to which records have been folded into _keys
+        self._offset = 0
+
+    def _catch_up(self):
+        """Add the keys of records appended since the last call (caller holds _lock)"""
+        records, self._offset = self.read_since(self._offset)
+        for record in records:
+            self._keys.add((record['submission_date'], record['nickname']))
+        if records:
+            logger.info(f"Loaded {len(records)} submission keys from {self.path}")
+
+    def read_all(self):
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(normalize_record(json.loads(line)))
+                except ValueError:
+                    # A torn final line from a crash mid-write is skipped
+                    logger.warning(f"Skipping unreadable line {line_number} in {self.path}")
+        return records
+
+    def read_since(self, cursor):
+        """Read the records appended after byte offset `cursor`"""
+        offset = cursor or 0
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= offset:
+            return [], offset
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # Only consume complete lines; a record still being written is picked up next time
+        end = data.rfind(b'\n') + 1
+        records = []
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(normalize_record(json.loads(line)))
+            except ValueError:
+                logger.warning(f"Skipping unreadable record in {self.path}")
+        return records, offset + end
+
+    def exists(self, submission_date, nickname):
+        with self._lock:
+            self._catch_up()
+            return (submission_date, nickname) in self._keys
+
+    def is_empty(self):
+        return not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+
+    def add(self, record):
+        """Durably append one submission, rejecting a second one for the same day"""
+        error = self.add_many([record])[0]
+        if error is not None:
+            raise error
+
+    def add_many(self, records):
+        """Append a batch of submissions with a single write and fsync"""
+        errors = []
+        lines = []
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                self._catch_up()
+                batch_keys = set()
+                for record in records:
+                    key = (record['submission_date'], record['nickname'])
+                    if key in self._keys or key in batch_keys:
+                        errors.append(ValueError(DUPLICATE_SUBMISSION_ERROR))
+                        continue
+                    batch_keys.add(key)
+                    lines.append(json.dumps(record, separators=(',', ':')) + '\n')
+                    errors.append(None)
+                if lines:
+                    data = ''.join(lines).encode('utf-8')
+                    if os.fstat(fd).st_size > self._offset:
+                        # Terminate a torn line left by a crashed writer so it is skipped
+                        data = b'\n' + data
+                    while data:
+                        data = data[os.write(fd, data):]
+                    os.fsync(fd)
+                    self._keys.update(batch_keys)
+                    self._offset = os.fstat(fd).st_size
+            finally:
+                # Closing the descriptor releases the flock
+                os.close(fd)
+        return errors
+
+
+class SqliteSubmissionStore(SubmissionStore):
+    """Submission store backed by a WAL-mode SQLite database (local/dev and tests)"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nickname TEXT NOT NULL,
+            submission_date TEXT NOT NULL,
+            players TEXT NOT NULL,
+            results TEXT NOT NULL,
+            predicted_wins REAL NOT NULL DEFAULT 0,
+            team_stats TEXT NOT NULL DEFAULT '{}',
+            created_at TEXT,
+            dataset_version TEXT,
+            roster_mask INTEGER,
+            roster_hash TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_submissions_date ON submissions(submission_date);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_nickname_date ON submissions(nickname, submission_date);
+    """
+
+    # The players column holds the roster's player IDs
+    COLUMNS = ('id, submission_date, nickname, players, results, predicted_wins, team_stats, created_at, '
+               'dataset_version, roster_mask, roster_hash')
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(submissions)')]
+            for column, column_type in [('dataset_version', 'TEXT'), ('roster_mask', 'INTEGER'),
+                                        ('roster_hash', 'TEXT')]:
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE submissions ADD COLUMN {column} {column_type}')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=FULL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._connect()
+        with conn:
+            yield conn
+
+    def _to_record(self, row):
+        # Rows written before roster hashes were stored get one computed here
+        return normalize_record({
+            'id': row[0],
+            'submission_date': row[1],
+            'nickname': row[2],
+            'player_ids': extract_player_ids(json.loads(row[3])),
+            'dataset_version': row[8],
+            'roster_mask': row[9],
+            'roster_hash': row[10],
+            'results': json.loads(row[4]),
+            'predicted_wins': row[5],
+            'team_stats': json.loads(row[6]),
+            'created_at': row[7]
+        })
+
+    INSERT = ('INSERT INTO submissions (submission_date, nickname, players, results, '
+              'predicted_wins, team_stats, created_at, dataset_version, roster_mask, roster_hash) '
+              'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+
+    def _insert_params(self, record):
+        return (record['submission_date'], record['nickname'], json.dumps(record['player_ids']),
+                json.dumps(record['results']), record['predicted_wins'],
+                json.dumps(record['team_stats']), record['created_at'], record['dataset_version'],
+                record['roster_mask'], record['roster_hash'])
+
+    def add(self, record):
+        try:
+            with self._connection() as conn:
+                conn.execute(self.INSERT, self._insert_params(record))
+        except sqlite3.IntegrityError:
+            raise ValueError(DUPLICATE_SUBMISSION_ERROR)
+
+    def add_many(self, records):
+        """Insert a batch of submissions in one transaction"""
+        errors = []
+        with self._connection() as conn:
+            for record in records:
+                # A failed INSERT only undoes its own statement, not the transaction
+                try:
+                    conn.execute(self.INSERT, self._insert_params(record))
+                    errors.append(None)
+                except sqlite3.IntegrityError:
+                    errors.append(ValueError(DUPLICATE_SUBMISSION_ERROR))
+        return errors
+
+    def read_all(self):
+        with self._connection() as conn:
+            rows = conn.execute(f'SELECT {self.COLUMNS} FROM submissions ORDER BY id').fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def read_date(self, submission_date):
+        with self._connection() as conn:
+            rows = conn.execute(
+                f'SELECT {self.COLUMNS} FROM submissions WHERE submission_date = ? '
+                'ORDER BY predicted_wins DESC, created_at', (submission_date,)).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def read_since(self, cursor):
+        with self._connection() as conn:
+            rows = conn.execute(
+                f'SELECT {self.COLUMNS} FROM submissions WHERE id > ? ORDER BY id', (cursor or 0,)).fetchall()
+        records = [self._to_record(row) for row in rows]
+        return records, (records[-1]['id'] if records else cursor or 0)
+
+    def exists(self, submission_date, nickname):
+        with self._connection() as conn:
+            return conn.execute(
+                'SELECT 1 FROM submissions WHERE nickname = ? AND submission_date = ?',
+                (nickname, submission_date)).fetchone() is not None
+
+    def is_empty(self):
+        with self._connection() as conn:
+            return conn.execute('SELECT 1 FROM submissions LIMIT 1').fetchone() is None
+
+
+class PostgresSubmissionStore(SubmissionStore):
+    """Submission store backed by Postgres through a thread-safe connection pool"""
+
+    # Seconds an id skipped by read_since is re-queried before it is taken to
+    # belong to a rolled-back or conflicting insert rather than a slow commit
+    GAP_TIMEOUT = 300
+    # Most skipped ids a cursor remembers; the newest are kept
+    MAX_GAPS = 10_000
+
+    # The players column holds the roster's player IDs
+    COLUMNS = ('id, submission_date, nickname, players, results, predicted_wins, team_stats, created_at, '
+               'dataset_version, roster_mask, roster_hash')
+
+    def __init__(self, min_connections=1, max_connections=10, **connect_kwargs):
+        # psycopg2 is only needed when this backend is selected
+        import psycopg2
+        import psycopg2.pool
+        from psycopg2.extras import Json
+        self._json = Json
+        self._db_error = psycopg2.Error
+        self._pool = psycopg2.pool.ThreadedConnectionPool(min_connections, max_connections, **connect_kwargs)
+        self.apply_migrations()
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+
+    def apply_migrations(self):
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                for name in MIGRATIONS:
+                    with open(os.path.join(MIGRATIONS_DIR, name), 'r') as f:
+                        cur.execute(f.read())
+        logger.info("Applied submission table migrations")
+
+    def _to_record(self, row):
+        # Rows written before roster hashes were stored get one computed here
+        return normalize_record({
+            'id': row[0],
+            'submission_date': row[1].isoformat(),
+            'nickname': row[2],
+            'player_ids': extract_player_ids(row[3]),
+            'dataset_version': row[8],
+            'roster_mask': row[9],
+            'roster_hash': row[10],
+            'results': row[4],
+            'predicted_wins': row[5],
+            'team_stats': row[6],
+            'created_at': row[7].isoformat() if row[7] is not None else None
+        })
+
+    # Conflicts on idx_submissions_nickname_date insert nothing and return no row
+    INSERT = ('INSERT INTO submissions (submission_date, nickname, players, results, '
+              'predicted_wins, team_stats, created_at, dataset_version, roster_mask, roster_hash) '
+              'VALUES (%s, %s, %s, %s, %s, %s, COALESCE(%s::timestamptz, CURRENT_TIMESTAMP), %s, %s, %s) '
+              'ON CONFLICT (nickname, submission_date) DO NOTHING RETURNING id')
+
+    def _insert_params(self, record):
+        return (record['submission_date'], record['nickname'], self._json(record['player_ids']),
+                self._json(record['results']), record['predicted_wins'],
+                self._json(record['team_stats']), record['created_at'], record['dataset_version'],
+                record['roster_mask'], record['roster_hash'])
+
+    def add(self, record):
+        error = self.add_many([record])[0]
+        if error is not None:
+            raise error
+
+    def add_many(self, records):
+        """Insert a batch of submissions in one transaction.
+
+        Each INSERT runs under its own savepoint, so a row Postgres rejects
+        fails only that record instead of aborting the whole batch.
+        """
+        errors = []
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                for record in records:
+                    cur.execute('SAVEPOINT submission')
+                    try:
+                        cur.execute(self.INSERT, self._insert_params(record))
+                        inserted = cur.fetchone() is not None
+                    except self._db_error as e:
+                        logger.error(f"Error inserting submission for {record['nickname']}: {str(e)}")
+                        cur.execute('ROLLBACK TO SAVEPOINT submission')
+                        errors.append(e)
+                        continue
+                    cur.execute('RELEASE SAVEPOINT submission')
+                    errors.append(None if inserted else ValueError(DUPLICATE_SUBMISSION_ERROR))
+        return errors
+
+    def read_all(self):
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f'SELECT {self.COLUMNS} FROM submissions ORDER BY id')
+                rows = cur.fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def read_date(self, submission_date):
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f'SELECT {self.COLUMNS} FROM submissions WHERE submission_date = %s '
+                    'ORDER BY predicted_wins DESC, created_at', (submission_date,))
+                rows = cur.fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def read_since(self, cursor):
+        """The cursor is (highest id read, {skipped id: time first skipped}).
+
+        Ids are drawn from a sequence at INSERT time but become visible at
+        COMMIT, so a batch that commits late can land below ids already read.
+        Every id skipped past is remembered and re-queried on later reads
+        until it shows up or GAP_TIMEOUT passes.
+        """
+        last_id, gaps = cursor or (0, {})
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f'SELECT {self.COLUMNS} FROM submissions WHERE id > %s OR id = ANY(%s) ORDER BY id',
+                            (last_id, list(gaps)))
+                rows = cur.fetchall()
+        records = [self._to_record(row) for row in rows]
+
+        now = time.monotonic()
+        gaps = {gap: since for gap, since in gaps.items() if now - since < self.GAP_TIMEOUT}
+        seen = {record['id'] for record in records}
+        for record_id in seen:
+            gaps.pop(record_id, None)
+        new_last_id = max(seen, default=last_id)
+        skipped = np.setdiff1d(np.arange(last_id + 1, new_last_id), np.fromiter(seen, dtype=np.int64))
+        for record_id in skipped[-self.MAX_GAPS:].tolist():
+            gaps[record_id] = now
+        if len(gaps) > self.MAX_GAPS:
+            gaps = dict(sorted(gaps.items())[-self.MAX_GAPS:])
+        return records, (max(last_id, new_last_id), gaps)
+
+    def exists(self, submission_date, nickname):
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1 FROM submissions WHERE nickname = %s AND submission_date = %s',
+                            (nickname, submission_date))
+                return cur.fetchone() is not None
+
+    def is_empty(self):
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1 FROM submissions LIMIT 1')
+                return cur.fetchone() is None
+
+
+class PartitionedSubmissionLog(SubmissionStore):
+    """Submission logs split into one JSON lines segment per submission_date.
+
+    Today's segment is the hot append segment; a past date's leaderboard
+    reads only that day's file. Closed days are also compacted into a
+    columnar `<date>.npz` (nicknames, roster IDs, predicted wins) for
+    offline analytics; see build_history_arrays and load_history.
+    """
+
+    date_partitioned = True
+
+    # Days before today that still take submissions (clock skew around midnight)
+    OPEN_DAYS = OPEN_DAYS
+
+    DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+    # Held while compacting, so only one worker writes a day's .npz at a time
+    COMPACT_LOCK_FILE = '.compact.lock'
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._segments = {}
+        self._open_date = None
+
+    def _segment(self, submission_date):
+        if not self.DATE_PATTERN.match(submission_date):
+            raise ValueError(f"Invalid submission date: {submission_date}")
+        with self._lock:
+            segment = self._segments.get(submission_date)
+            if segment is None:
+                path = os.path.join(self.directory, f'{submission_date}.jsonl')
+                segment = self._segments[submission_date] = SubmissionLog(path)
+            return segment
+
+    def dates(self):
+        """Return every date that has a segment, oldest first"""
+        return sorted(name[:-len('.jsonl')] for name in os.listdir(self.directory)
+                      if name.endswith('.jsonl') and self.DATE_PATTERN.match(name[:-len('.jsonl')]))
+
+    def open_dates(self):
+        today = game_today()
+        return [(today - timedelta(days=days)).isoformat() for days in range(self.OPEN_DAYS, -1, -1)]
+
+    def add(self, record):
+        error = self.add_many([record])[0]
+        if error is not None:
+            raise error
+
+    def add_many(self, records):
+        """Append each day's records to its own segment"""
+        errors = [None] * len(records)
+        by_date = {}
+        for position, record in enumerate(records):
+            by_date.setdefault(record['submission_date'], []).append(position)
+        for submission_date, positions in by_date.items():
+            segment_errors = self._segment(submission_date).add_many([records[p] for p in positions])
+            for position, error in zip(positions, segment_errors):
+                errors[position] = error
+        self._roll_over(max(by_date) if by_date else None)
+        return errors
+
+    def _roll_over(self, latest_date):
+        """Compact closed days in the background the first time a new day is seen"""
+        if latest_date is None:
+            return
+        with self._lock:
+            if self._open_date is not None and latest_date <= self._open_date:
+                return
+            self._open_date = latest_date
+        threading.Thread(target=self.compact_closed_days, args=(latest_date,), daemon=True).start()
+
+    def read_all(self):
+        records = []
+        for submission_date in self.dates():
+            records.extend(self._segment(submission_date).read_all())
+        return records
+
+    def read_date(self, submission_date):
+        if not self.DATE_PATTERN.match(submission_date):
+            return []
+        return sort_records(self._segment(submission_date).read_all())
+
+    def _read_segments_since(self, dates, cursor):
+        offsets = dict(cursor or {})
+        records = []
+        for submission_date in dates:
+            segment_records, offsets[submission_date] = self._segment(submission_date).read_since(
+                offsets.get(submission_date))
+            records.extend(segment_records)
+        return records, offsets
+
+    def read_since(self, cursor):
+        """The cursor is a {date: byte offset} dict covering every segment"""
+        return self._read_segments_since(self.dates(), cursor)
+
+    def read_open_since(self, cursor):
+        return self._read_segments_since(self.open_dates(), cursor)
+
+    def exists(self, submission_date, nickname):
+        return self._segment(submission_date).exists(submission_date, nickname)
+
+    def is_empty(self):
+        return all(self._segment(d).is_empty() for d in self.dates())
+
+    def compact_segment(self, submission_date):
+        """Write the columnar <date>.npz for one day's segment"""
+        records = self._segment(submission_date).read_all()
+        player_ids = np.full((len(records), ROSTER_SIZE), -1, dtype=np.int64)
+        # -1 marks rosters that could not be encoded against the day's pool
+        roster_masks = np.array([record.get('roster_mask') if record.get('roster_mask') is not None else -1
+                                 for record in records], dtype=np.int32)
+        for row, record in enumerate(records):
+            roster = record['player_ids'][:ROSTER_SIZE]
+            player_ids[row, :len(roster)] = roster
+        npz_path = os.path.join(self.directory, f'{submission_date}.npz')
+        tmp_path = f'{npz_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                nicknames=np.array([record['nickname'] for record in records], dtype=str),
+                player_ids=player_ids,
+                roster_masks=roster_masks,
+                predicted_wins=np.array([record['predicted_wins'] for record in records], dtype=np.float64)
+            )
+        os.replace(tmp_path, npz_path)
+        logger.info(f"Compacted {len(records)} submissions for {submission_date}")
+        return npz_path
+
+    def compact_closed_days(self, before=None):
+        """Compact every day before `before` whose .npz is missing or out of date.
+
+        Every worker calls this when it first sees a new day; an exclusive
+        flock on the directory's lock file makes them take turns, and later
+        ones find the .npz files already up to date.
+        """
+        before = before or game_date()
+        compacted = 0
+        fd = os.open(os.path.join(self.directory, self.COMPACT_LOCK_FILE), os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            for submission_date in self.dates():
+                if submission_date >= before:
+                    continue
+                segment_path = os.path.join(self.directory, f'{submission_date}.jsonl')
+                npz_path = os.path.join(self.directory, f'{submission_date}.npz')
+                if os.path.exists(npz_path) and os.path.getmtime(npz_path) >= os.path.getmtime(segment_path):
+                    continue
+                try:
+                    self.compact_segment(submission_date)
+                    compacted += 1
+                except Exception as e:
+                    logger.error(f"Error compacting {submission_date}: {str(e)}")
+        finally:
+            # Closing the descriptor releases the flock
+            os.close(fd)
+        return compacted
+
+
+# Arrays written by build_history_arrays, one row per stored submission
+HISTORY_ARRAYS = ['dates', 'player_ids', 'predicted_wins']
+
+
+def build_history_arrays(directory):
+    """Concatenate every compacted day into .npy files that can be memory-mapped.
+
+    `dates` holds each submission's date as a proleptic Gregorian ordinal.
+    """
+    dates, player_ids, predicted_wins = [], [], []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.npz') or not PartitionedSubmissionLog.DATE_PATTERN.match(name[:-len('.npz')]):
+            continue
+        ordinal = datetime.strptime(name[:-len('.npz')], '%Y-%m-%d').toordinal()
+        with np.load(os.path.join(directory, name)) as day:
+            dates.append(np.full(len(day['predicted_wins']), ordinal, dtype=np.int32))
+            player_ids.append(day['player_ids'])
+            predicted_wins.append(day['predicted_wins'])
+    arrays = {
+        'dates': np.concatenate(dates) if dates else np.zeros(0, dtype=np.int32),
+        'player_ids': np.concatenate(player_ids) if player_ids else np.zeros((0, ROSTER_SIZE), dtype=np.int64),
+        'predicted_wins': np.concatenate(predicted_wins) if predicted_wins else np.zeros(0, dtype=np.float64)
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f'history_{name}.npy'), array)
+    logger.info(f"Built history arrays with {len(arrays['dates'])} submissions")
+    return len(arrays['dates'])
+
+
+def load_history(directory):
+    """Memory-map the arrays written by build_history_arrays"""
+    return {name: np.load(os.path.join(directory, f'history_{name}.npy'), mmap_mode='r')
+            for name in HISTORY_ARRAYS}
+
+
+def sort_records(records):
+    """Order records for a leaderboard: most predicted wins, then earliest submission"""
+    return sorted(records, key=lambda r: (-r['predicted_wins'], r.get('created_at') or ''))
+
+
+def create_submission_store():
+    """Build the store selected by the SUBMISSION_STORE environment variable.
+
+    Defaults to Postgres when DB_HOST is configured and to the JSON lines
+    log otherwise.
+    """
+    backend = os.environ.get('SUBMISSION_STORE')
+    # One of: postgres, sqlite, jsonl, partitioned
+    if not backend:
+        backend = 'postgres' if os.environ.get('DB_HOST') else 'jsonl'
+    if backend == 'postgres':
+        logger.info("Using Postgres submission store")
+        return PostgresSubmissionStore(
+            max_connections=int(os.environ.get('DB_POOL_SIZE', 10)),
+            host=os.environ.get('DB_HOST'),
+            port=os.environ.get('DB_PORT', 5432),
+            dbname=os.environ.get('DB_NAME'),
+            user=os.environ.get('DB_USER'),
+            password=os.environ.get('DB_PASSWORD')
+        )
+    if backend == 'sqlite':
+        logger.info("Using SQLite submission store")
+        return SqliteSubmissionStore(os.environ.get('SUBMISSIONS_DB', 'submissions.db'))
+    if backend == 'partitioned':
+        logger.info("Using date-partitioned submission store")
+        return PartitionedSubmissionLog(os.environ.get('SUBMISSIONS_DIR', 'submissions'))
+    if backend == 'jsonl':
+        logger.info("Using JSON lines submission store")
+        return SubmissionLog(os.environ.get('SUBMISSIONS_LOG', 'submissions.jsonl'))
+    raise ValueError(f"Unknown submission store: {backend}")
+
+
+def extract_player_ids(players):
+    """Return the player IDs of a roster stored as IDs or as full player dicts"""
+    player_ids = []
+    for player in players:
+        if isinstance(player, dict):
+            player = player['Player ID'] if 'Player ID' in player else player['id']
+        player_ids.append(int(player))
+    return player_ids
+
+
+def normalize_record(record):
+    """Convert a record written before rosters were stored as player IDs"""
+    if 'player_ids' not in record:
+        record['player_ids'] = extract_player_ids(record.pop('players', []))
+    record.setdefault('dataset_version', None)
+    record.setdefault('roster_mask', None)
+    if record.get('roster_hash') is None:
+        record['roster_hash'] = roster_hash(record['player_ids'])
+    return record
+
+
+def make_record(submission_date, nickname, player_ids, dataset_version, results, predicted_wins, team_stats,
+                roster_mask=None):
+    """Build the stored representation of one submission.
+
+    `roster_mask` is the roster as a bitmask over the day's pool (see
+    rosters.PoolIndex), or None when a player is outside the pool.
+    """
+    return {
+        'submission_date': submission_date,
+        'nickname': nickname,
+        'player_ids': [int(player_id) for player_id in player_ids],
+        'dataset_version': dataset_version,
+        'roster_mask': roster_mask,
+        'roster_hash': roster_hash(player_ids),
+        'results': results,
+        'predicted_wins': float(predicted_wins),
+        'team_stats': team_stats,
+        'created_at': datetime.now().isoformat()
+    }
+
+
+if __name__ == '__main__':
+    # Usage: python submission_store.py export [submissions.csv]
+    #        python submission_store.py compact   (partitioned store only)
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == 'export':
+        csv_path = sys.argv[2] if len(sys.argv) > 2 else 'submissions.csv'
+        create_submission_store().export_csv(csv_path)
+    elif command == 'compact':
+        store = create_submission_store()
+        if not isinstance(store, PartitionedSubmissionLog):
+            print("Compaction needs SUBMISSION_STORE=partitioned")
+            sys.exit(1)
+        store.compact_closed_days()
+        build_history_arrays(store.directory)
+    else:
+        print("Usage: python submission_store.py export [csv_path] | compact")
+        sys.exit(1)
@@ -0,0 +1,47 @@
+import logging
+
+from batching import QueueBatcher
+from submission_store import DUPLICATE_SUBMISSION_ERROR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitWriter(QueueBatcher):
+    """Background writer that commits submissions to a store in batches.
+
+    Callers block in `submit` until the batch holding their record has been
+    committed, so a response still means the submission is durable, but a
+    burst of submits shares a single append/fsync or transaction. A lone
+    submit is committed at once; during a burst a batch is flushed after
+    `max_delay` seconds or once it holds `max_batch` records.
+    """
+
+    def __init__(self, store, key_index, max_batch=256, max_delay=0.002):
+        self.store = store
+        # (submission_date, nickname) pairs accepted or waiting to be written
+        self.key_index = key_index
+        super().__init__('submission-writer', max_batch, max_delay)
+
+    def submit(self, record):
+        """Queue a record and wait until it is committed; raises ValueError on a duplicate"""
+        key = (record['submission_date'], record['nickname'])
+        if not self.key_index.reserve(key):
+            raise ValueError(DUPLICATE_SUBMISSION_ERROR)
+
+        pending = self._wait_for(record)
+        if pending.error is not None:
+            if not isinstance(pending.error, ValueError):
+                # The record was not stored, so the nickname may try again
+                self.key_index.release(key)
+            raise pending.error
+
+    def process_batch(self, batch):
+        try:
+            errors = self.store.add_many([pending.item for pending in batch])
+        except Exception as e:
+            logger.error(f"Error committing {len(batch)} submissions: {str(e)}")
+            errors = [e] * len(batch)
+        for pending, error in zip(batch, errors):
+            pending.error = error
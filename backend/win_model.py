@@ -0,0 +1,125 @@
+import logging
+
+import numpy as np
+
+from flat_forest import FlatForest
+from roster_space import MEAN_FEATURES, ROSTER_SIZE
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Folded predictions must agree with sklearn this closely to be used
+FOLD_TOLERANCE = 1e-9
+# Largest batch scored by the flattened forest; sklearn's compiled traversal
+# is faster beyond about a hundred rows
+FLAT_FOREST_MAX_ROWS = 64
+
+
+def fold_linear(model, scaler):
+    """Fold a standard scaler into a linear model's coefficients.
+
+    Returns (weights, bias) such that model.predict(scaler.transform(X))
+    equals X @ weights + bias, or None if the model is not linear.
+    """
+    coef = getattr(model, 'coef_', None)
+    if coef is None or not hasattr(scaler, 'scale_') or not hasattr(scaler, 'mean_'):
+        return None
+    coef = np.asarray(coef, dtype=np.float64).ravel()
+    weights = coef / scaler.scale_
+    bias = float(model.intercept_) - float(weights @ scaler.mean_)
+    return weights, bias
+
+
+class WinPredictor:
+    """Raw (unclamped) predicted wins from unscaled team features.
+
+    For linear models the scaler and coefficients are folded into one
+    weight vector and bias at load, so a prediction is a single dot product
+    instead of two sklearn calls. The fold is checked against sklearn on
+    sample rows first; any other model, or a fold that disagrees, uses
+    sklearn directly.
+
+    Random forests and regression trees are also flattened into a
+    FlatForest, which scores small batches without sklearn's per-tree call
+    overhead. It is used only if it reproduces sklearn exactly on the
+    sample rows.
+    """
+
+    def __init__(self, model, scaler, seed=0):
+        self.model = model
+        self.scaler = scaler
+        self.weights = None
+        self.bias = None
+        self.forest = None
+        rng = np.random.default_rng(seed)
+        folded = fold_linear(model, scaler)
+        if folded is not None:
+            weights, bias = folded
+            sample = scaler.mean_ + scaler.scale_ * rng.normal(size=(256, len(weights)))
+            expected = model.predict(scaler.transform(sample))
+            if np.allclose(sample @ weights + bias, expected, rtol=FOLD_TOLERANCE, atol=FOLD_TOLERANCE):
+                self.weights, self.bias = weights, bias
+            else:
+                logger.warning("Folded linear model disagrees with sklearn; using sklearn")
+        else:
+            forest = FlatForest.from_model(model)
+            if forest is not None:
+                scaled = rng.normal(size=(256, model.n_features_in_))
+                if np.array_equal(forest.predict(scaled), model.predict(scaled)):
+                    self.forest = forest
+                else:
+                    logger.warning("Flattened forest disagrees with sklearn; using sklearn")
+        if self.folded:
+            path = 'folded linear weights'
+        elif self.forest is not None:
+            path = f'flattened forest of {self.forest.n_trees} trees'
+        else:
+            path = 'sklearn'
+        logger.info(f"Win predictor using {path}")
+
+    @property
+    def folded(self):
+        return self.weights is not None
+
+    def predict(self, features):
+        """Predict wins for each row of an (N, features) matrix"""
+        if self.weights is not None:
+            return np.asarray(features, dtype=np.float64) @ self.weights + self.bias
+        scaled = self.scaler.transform(features)
+        if self.forest is not None and len(scaled) <= FLAT_FOREST_MAX_ROWS:
+            return self.forest.predict(scaled)
+        return self.model.predict(scaled)
+
+    def contributions(self, stats, roster_size=ROSTER_SIZE):
+        """Each player's additive share of the folded prediction for a roster of this size"""
+        weights = self.weights.copy()
+        # Mean features divide each player's stat by the roster size
+        weights[MEAN_FEATURES] /= roster_size
+        return np.asarray(stats, dtype=np.float64) @ weights
+
+
+class WinContributions:
+    """Precomputed win contribution of every player for a folded linear model.
+
+    A roster of `roster_size` players is predicted to win `bias` plus the
+    sum of its players' contributions, so a prediction is a few array
+    lookups and an add, and each term explains one player's share.
+    """
+
+    def __init__(self, predictor, player_ids, stats, roster_size=ROSTER_SIZE):
+        self.bias = predictor.bias
+        self.roster_size = roster_size
+        self.values = predictor.contributions(stats, roster_size)
+        self.rows = {int(player_id): row for row, player_id in enumerate(player_ids)}
+
+    def __contains__(self, player_id):
+        return player_id in self.rows
+
+    def explain(self, player_ids):
+        """Return the contribution of each player, in the order given"""
+        return self.values[[self.rows[player_id] for player_id in player_ids]]
+
+    def predict(self, player_ids):
+        """Raw predicted wins of a roster of `roster_size` known players"""
+        return self.bias + float(self.explain(player_ids).sum())
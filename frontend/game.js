@@ -366,7 +366,7 @@ class NBABudgetGame {
                 },
                 body: JSON.stringify({
                     nickname: this.nickname,
-                    players: this.selectedPlayers,
+                    players: this.selectedPlayers.map(player => player['Player ID']),
                     results: {
                         wins: predictedWins,
                         losses: 82 - predictedWins